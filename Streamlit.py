@@ -1,25 +1,232 @@
+import functools
+import os
+import threading
+import time
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx
 import pandas as pd
-import numpy as np
-import seaborn as sns
-import statsmodels.api as sm
-import plotly.graph_objects as go
-import plotly.express as px
-import matplotlib.pyplot as plt
-from scipy.stats import norm
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import MinMaxScaler
-
+from dashboard import artifacts, cropstore, loader, sharedcache
+from dashboard.bundle import DEFAULT_BUNDLE_DIR, Bundle
+from dashboard.figures import FigureCache
+from dashboard.instrumentation import recorder
+from dashboard.lazy import lazy_import
+from dashboard.whatif import scenario_summary
+
+# Plotting and model backends load the first time a tab or analysis uses them, so the
+# Data view of a fresh worker only imports pandas (python -m benchmarks.startup checks this)
+go = lazy_import("plotly.graph_objects")
+charts = lazy_import("dashboard.charts")
+
+run_started = time.perf_counter()
+
+# Scenarios the What-if editor starts with
+WHAT_IF_DEFAULT_CHANGES = [
+    {"scenario": "Rainfall -20%", "feature": "Annual_rainfall", "change_pct": -20.0, "state": ""},
+    {"scenario": "MSP +10%", "feature": "MSP", "change_pct": 10.0, "state": ""},
+]
+MGNREGA_WHAT_IF_DEFAULT_CHANGES = [
+    {"scenario": "Demand +20%", "feature": "Employment_demanded", "change_pct": 20.0, "state": ""},
+    {"scenario": "Offered -10%", "feature": "Employment_offered", "change_pct": -10.0, "state": ""},
+]
 st.set_page_config(layout="wide", page_title="Agricultural Dashboard")
-# Load the datasets
-@st.cache_data
-def load_data():
-    crop_data = pd.read_csv('Crop_data.csv')
-    area_affected = pd.read_csv('Area_affected.csv')
-    mgnrega = pd.read_csv('mgnrega.csv')
+
+# st.cache_resource that also counts hits/misses per loader and times each computation
+def cached_resource(func=None, **options):
+    if func is None:
+        return functools.partial(cached_resource, **options)
+    state = threading.local()
+
+    @functools.wraps(func)
+    def compute(*args, **kwargs):
+        state.computed = True
+        with recorder.section(f"compute.{func.__name__}"):
+            return func(*args, **kwargs)
+
+    cached = st.cache_resource(**options)(compute)
+
+    @functools.wraps(func)
+    def lookup(*args, **kwargs):
+        state.computed = False
+        result = cached(*args, **kwargs)
+        recorder.cache_lookup(func.__name__, hit=not state.computed)
+        return result
+    return lookup
+
+# Models and heavy results go in the process-wide shared cache instead: sessions asking for the same key at
+# once wait for a single computation, and least recently used entries go past DASHBOARD_RESULT_CACHE_MB
+def shared_result(func):
+    state = threading.local()
+
+    def compute(*args):
+        state.computed = True
+        with recorder.section(f"compute.{func.__name__}"):
+            return func(*args)
+
+    @functools.wraps(func)
+    def lookup(*args):
+        state.computed = False
+        result = sharedcache.results.get_or_compute((func.__name__,) + args, lambda: compute(*args))
+        recorder.cache_lookup(func.__name__, hit=not state.computed)
+        return result
+    return lookup
+
+# Load the datasets (parsed once into the columnar cache under .cache/, memory-mapped afterwards).
+# With DASHBOARD_CROP_STORE set, crop_data is a partitioned on-disk store read per state instead.
+# cache_resource shares one copy per data version across reruns; nothing below modifies these frames.
+# The version comes from the files' fingerprints, so a year added by ingest.py reaches a running server.
+@cached_resource
+def load_data(version):
+    crop_data, area_affected, mgnrega = cropstore.load_all()
     return crop_data, area_affected, mgnrega
 
-crop_data, area_affected, mgnrega = load_data()
+with recorder.section("data.load"):
+    data_version = cropstore.data_version()
+    crop_data, area_affected, mgnrega = load_data(data_version)
+
+# Rendered matplotlib figures (PNG bytes), shared by all sessions and capped in memory
+@cached_resource
+def load_figure_cache():
+    return FigureCache(max_bytes=64 * 1024 * 1024)
+
+# Results written by precompute.py for this data version, or None if it hasn't been run.
+# Its pre-rendered figures go straight into the figure cache.
+@cached_resource
+def load_bundle(version):
+    bundle = Bundle.open(DEFAULT_BUNDLE_DIR, version)
+    if bundle is not None:
+        for key, png in bundle.images():
+            load_figure_cache().put(key + (version,), png)
+    return bundle
+
+# Every loader below reads the bundle when there is one and computes otherwise
+
+# Min-max scaled MGNREGA columns shown by the Mgnrega tab, fitted once per data version
+@shared_result
+def load_scaled_views(version):
+    crop_data, area_affected, mgnrega = load_data(version)
+    return artifacts.scaled_views(mgnrega)
+
+# Moments, quartiles, histograms and KDE grids for every numeric column, once per data version
+@shared_result
+def load_summaries(version):
+    bundle = load_bundle(version)
+    if bundle is not None:
+        return bundle.summaries()
+    return artifacts.summaries(artifacts.dataset_frames(*load_data(version)))
+
+# State/year panel of all the datasets with its correlation matrices, once per data version
+@shared_result
+def load_correlations(version):
+    bundle = load_bundle(version)
+    if bundle is not None:
+        return bundle.correlations()
+    return artifacts.correlations(load_panel(version))
+
+# All-states (State, year) distress panel with its lagged correlations, once per data version
+@shared_result
+def load_distress(version):
+    bundle = load_bundle(version)
+    if bundle is not None:
+        return bundle.distress()
+    return artifacts.distress(*load_data(version))
+
+# Quartiles, fences and outlier rows for every numeric column, once per data version
+@shared_result
+def load_outliers(version):
+    bundle = load_bundle(version)
+    if bundle is not None:
+        return bundle.outliers()
+    return artifacts.outliers(artifacts.dataset_frames(*load_data(version)))
+
+# QQ-plot quantiles (downsampled) and normality statistics, once per data version
+@shared_result
+def load_qq_points(version):
+    bundle = load_bundle(version)
+    if bundle is not None:
+        return bundle.qq_data()
+    return artifacts.qq_data(artifacts.dataset_frames(*load_data(version)))
+
+# Per-year Random Forest importances ('Harvest_Price' by Crop_Year, 'Employment_Availed' by year).
+# Without a bundle, years are trained in parallel and cached on disk, so reruns don't retrain.
+@shared_result
+def load_importances(version, model):
+    bundle = load_bundle(version)
+    if bundle is not None:
+        return bundle.importances(model)
+    crop_data, area_affected, mgnrega = load_data(version)
+    return artifacts.harvest_importances(crop_data) if model == "harvest" else artifacts.mgnrega_importances(mgnrega)
+
+# Fitted per-year forests for what-if predictions, memory-mapped from the model store (trained only if missing)
+@shared_result
+def load_models(version, model):
+    crop_data, area_affected, mgnrega = load_data(version)
+    return artifacts.harvest_models(crop_data) if model == "harvest" else artifacts.mgnrega_models(mgnrega)
+
+# Crop_data, dataset1 WPI, MGNREGA and Area_affected joined on (State, Crop, year), built once per data version.
+# Every per-state view slices this instead of filtering the source frames.
+@cached_resource
+def load_panel(version):
+    return artifacts.unified_panel(*load_data(version), loader.load_table("wpi"))
+
+# Same index over the scaled MGNREGA frame used by the Mgnrega tab
+@cached_resource
+def load_scaled_index(version):
+    return artifacts.scaled_index(load_scaled_views(version))
+
+# Metric cards and trend series for one state
+@shared_result
+def load_state_view(version, state):
+    bundle = load_bundle(version)
+    if bundle is not None:
+        return bundle.state(state)
+    return artifacts.state_view(state, load_panel(version), load_scaled_index(version))
+
+panel = load_panel(data_version)
+figure_cache = load_figure_cache()
+load_bundle(data_version)
+recorder.gauge("figure_cache", lambda: {"hits": figure_cache.hits, "misses": figure_cache.misses,
+                                        "entries": len(figure_cache), "bytes": figure_cache.size})
+recorder.gauge("result_cache", sharedcache.results.stats)
+
+# With DASHBOARD_WARM_UP set, one background thread per process fills the shared cache at boot with the
+# all-states results and the views of the most populous states (a number) or of the listed states (names)
+@cached_resource
+def start_warm_up(version):
+    setting = sharedcache.WARM_UP.strip()
+    if not setting:
+        return None
+    states = artifacts.largest_states(mgnrega, int(setting)) if setting.isdigit() else [s.strip() for s in setting.split(",") if s.strip()]
+    tasks = [functools.partial(load, version) for load in (load_summaries, load_correlations, load_distress, load_outliers, load_qq_points)]
+    tasks += [functools.partial(load_importances, version, "harvest"), functools.partial(load_models, version, "harvest"),
+              functools.partial(load_importances, version, "mgnrega"), functools.partial(load_models, version, "mgnrega"),
+              functools.partial(load_scaled_views, version)]
+    tasks += [functools.partial(load_state_view, version, s) for s in states]
+    thread = sharedcache.WarmUp(tasks)
+    add_script_run_ctx(thread)
+    thread.start()
+    return thread
+
+start_warm_up(data_version)
+
+# Plotly figures are serialized and sent to the browser here, so time it separately
+def plotly_chart(fig):
+    with recorder.section("chart.plotly_send"):
+        st.plotly_chart(fig, use_container_width=True)
+
+# One trend from state_view (already reduced to the point budget on the server). When its points stand
+# for several rows, their min/max is drawn as a shaded band (lines) or as error bars (bars).
+def add_trend(fig, trend, name, label, color, yaxis=None, bar=False):
+    hover = f"<b>Year</b>: %{{x}}<br><b>{label}</b>: %{{y:,}}<extra></extra>"
+    envelope = trend["low"] is not None
+    if bar:
+        error_y = dict(type='data', symmetric=False, array=[h - v for h, v in zip(trend["high"], trend["y"])],
+                       arrayminus=[v - l for v, l in zip(trend["y"], trend["low"])]) if envelope else None
+        fig.add_trace(go.Bar(x=trend["x"], y=trend["y"], name=name, marker_color=color, yaxis=yaxis, error_y=error_y, hovertemplate=hover))
+        return
+    if envelope:
+        fig.add_trace(go.Scatter(x=trend["x"], y=trend["high"], mode='lines', line=dict(width=0, color=color), yaxis=yaxis, showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=trend["x"], y=trend["low"], mode='lines', line=dict(width=0, color=color), yaxis=yaxis, fill='tonexty', name=f"{name} range", hoverinfo='skip'))
+    fig.add_trace(go.Scatter(x=trend["x"], y=trend["y"], mode='lines+markers', name=name, line=dict(color=color), yaxis=yaxis, hovertemplate=hover))
 
 
 
@@ -55,40 +262,69 @@ col1, col2 = st.columns(2)
 with col1:
     state = st.selectbox("State:", [""] + sorted(mgnrega['State'].unique()))
 with col2:
-    view = st.selectbox("View:", ["", "Data", "Visualization"])
+    view = st.selectbox("View:", ["", "Data", "Visualization", "All States"])
 
 # Only display content if both dropdowns have been selected
-if state and view:
+# National view: every state ranked at once, no state selection needed
+if view == "All States":
+    with recorder.section("view.All States"):
+        distress = load_distress(data_version)
+        st.subheader("Rural Distress vs MGNREGA Demand • All States")
+        st.info(""" * **Demand YoY:** Change in Employment_demanded from the previous year.\n * **Yield change:** Area-weighted change in crop yields from the previous year; **Falling-yield area** is the share of crop area whose yield fell.\n * **Area affected:** Area_aff as a share of the state's total crop area.\n * **Rainfall anomaly:** Annual rainfall relative to the state's average over all years.\n * **Distress score:** Mean of the indicators' z-scores across states (higher = more distress). Click a column header to re-sort.""")
+        year = st.selectbox("Year:", distress.years)
+
+        st.dataframe(
+            distress.leaderboard(year),
+            column_config={
+                "Employment_demanded": st.column_config.NumberColumn("Employment demanded", format="localized"),
+                "demand_yoy": st.column_config.NumberColumn("Demand YoY", format="percent"),
+                "yield_change": st.column_config.NumberColumn("Yield change", format="percent"),
+                "yield_drop_share": st.column_config.ProgressColumn("Falling-yield area", min_value=0.0, max_value=1.0, format="percent"),
+                "worst_crop": "Worst crop",
+                "worst_crop_change": st.column_config.NumberColumn("Worst crop yield change", format="percent"),
+                "rainfall": st.column_config.NumberColumn("Rainfall", format="%.2f"),
+                "rainfall_anomaly": st.column_config.NumberColumn("Rainfall anomaly", format="percent"),
+                "area_aff_share": st.column_config.NumberColumn("Area affected", format="percent"),
+                "distress_score": st.column_config.NumberColumn("Distress score", format="%.2f"),
+                "r_yield_lag0": st.column_config.NumberColumn("r(demand, yield) same year", format="%.2f"),
+                "r_yield_lag1": st.column_config.NumberColumn("r(demand, yield) previous year", format="%.2f"),
+            },
+            use_container_width=True,
+        )
+        st.caption("Per-state correlations use each state's own years only, so they rest on a handful of points.")
+
+        st.subheader("Does distress lead demand?")
+        st.caption("Pearson correlation, pooled over all states, between the demand change in a year and each indicator in the same year (lag 0) or the year before (lag 1).")
+        st.dataframe(distress.correlations.style.format({"r": "{:+.3f}", "p": "{:.3g}"}), hide_index=True)
+
+elif state and view:
     if view == "Data":
-        st.subheader(f"Data for {state}")
-        st.info(""" * **State:** The geographic region or state where the MGNREGA data is reported.\n * **Rural_Population:** The total population living in rural areas within the state.\n * **year:** The year in which the data was recorded.\n * **No_of_Registered:** The number of individuals registered for MGNREGA work.\n * **Employment_demanded:** The total number of employment days demanded by registered individuals.\n * **Employment_offered:** The total number of employment days offered to individuals.\n * **Employment_Availed:** The total number of employment days availed by individuals.\n """)
-        # Display MGNREGA data
-        st.write("MGNREGA Data:")
-        st.dataframe(mgnrega[mgnrega['State'] == state])
+        with recorder.section("view.Data"):
+            st.subheader(f"Data for {state}")
+            st.info(""" * **State:** The geographic region or state where the MGNREGA data is reported.\n * **Rural_Population:** The total population living in rural areas within the state.\n * **year:** The year in which the data was recorded.\n * **No_of_Registered:** The number of individuals registered for MGNREGA work.\n * **Employment_demanded:** The total number of employment days demanded by registered individuals.\n * **Employment_offered:** The total number of employment days offered to individuals.\n * **Employment_Availed:** The total number of employment days availed by individuals.\n """)
+            # Display MGNREGA data
+            st.write("MGNREGA Data:")
+            st.dataframe(panel.state_rows(state, "mgnrega"))
         
-        st.info(""" * **Crop:** Type of crop being reported.\n * **State:** Geographic region or state where the crop is grown.\n * **Crop_Year:** The year in which the crop was grown or harvested.\n * **Area_(in_Ha):** Total area (in hectares) of land used for growing the crop.\n * **Production_(in_Tonnes):** Total amount of crop produced, measured in tonnes.\n * **Yield_(kg/Ha):** Average yield of the crop per hectare, measured in kilograms.\n * **MSP:** Minimum Support Price, the price at which the government guarantees to buy the crop.\n * **Annual_rainfall:** Total amount of rainfall received in a year, affecting crop growth.\n * **Cost_of_prod:** Cost incurred in the production of the crop.\n * **Harvest_Price:** Selling price of the crop at harvest time.""")
-        # Display Crop data
-        st.write("Crop Data:")
-        st.dataframe(crop_data[crop_data['State'] == state])
+            st.info(""" * **Crop:** Type of crop being reported.\n * **State:** Geographic region or state where the crop is grown.\n * **Crop_Year:** The year in which the crop was grown or harvested.\n * **Area_(in_Ha):** Total area (in hectares) of land used for growing the crop.\n * **Production_(in_Tonnes):** Total amount of crop produced, measured in tonnes.\n * **Yield_(kg/Ha):** Average yield of the crop per hectare, measured in kilograms.\n * **MSP:** Minimum Support Price, the price at which the government guarantees to buy the crop.\n * **Annual_rainfall:** Total amount of rainfall received in a year, affecting crop growth.\n * **Cost_of_prod:** Cost incurred in the production of the crop.\n * **Harvest_Price:** Selling price of the crop at harvest time.\n * **WPI:** Wholesale Price Index of the crop in that year (from dataset1.csv).""")
+            # Display Crop data
+            st.write("Crop Data:")
+            st.dataframe(panel.rows(state))
         
-        st.info(""" * **Year:** The year in which the data was recorded.\n * **State:** The geographic region or state where the crop area damage is reported.\n * **Total Area of State:** The total crop area of the state.\n * **Area_aff:** The area affected by crop-related issues or factors.\n * **Wages:** The wages paid, likely related to agricultural work or compensation in the affected area.""")
-        # Display Area Affected data
-        st.write("Area Affected Data:")
-        st.dataframe(area_affected[area_affected['State'] == state])
+            st.info(""" * **Year:** The year in which the data was recorded.\n * **State:** The geographic region or state where the crop area damage is reported.\n * **Total Area of State:** The total crop area of the state.\n * **Area_aff:** The area affected by crop-related issues or factors.\n * **Wages:** The wages paid, likely related to agricultural work or compensation in the affected area.""")
+            # Display Area Affected data
+            st.write("Area Affected Data:")
+            st.dataframe(panel.state_rows(state, "area"))
     
     elif view == "Visualization":
-        # Filter data for the selected state
-        state_mgnrega = mgnrega[mgnrega['State'] == state].sort_values('year')
-        state_crop = crop_data[crop_data['State'] == state].sort_values('Crop_Year')
-        state_area = area_affected[area_affected['State'] == state].sort_values('Year')
+        # Precomputed metric cards and trend series for the selected state
+        with recorder.section("state.load"):
+            state_view = load_state_view(data_version, state)
+        metrics = state_view["metrics"]
 
         # Metrics
-        col1, col2, col3, col4 = st.columns(4)
-        latest_year = 2023
-        prev_year = 2022
-        
-        latest_data = state_mgnrega[state_mgnrega['year'] == latest_year].iloc[0]
-        prev_data = state_mgnrega[state_mgnrega['year'] == prev_year].iloc[0] if prev_year in state_mgnrega['year'].values else None
+        latest_data = metrics["latest"]
+        prev_data = metrics["prev"]
 
         def calculate_change(current, previous):
             if previous and previous != 0:
@@ -96,446 +332,429 @@ if state and view:
                 return f"{change:+.2f}% from previous year"
             return None
 
-        with col1:
-            st.metric("No. of Registered", f"{latest_data['No_of_Registered']:,}", 
-                      calculate_change(latest_data['No_of_Registered'], prev_data['No_of_Registered']) if prev_data is not None else None)
-        with col2:
-            st.metric("Employment Demanded", f"{latest_data['Employment_demanded']:,}", 
-                      calculate_change(latest_data['Employment_demanded'], prev_data['Employment_demanded']) if prev_data is not None else None)
-        with col3:
-            st.metric("Employment Offered", f"{latest_data['Employment_offered']:,}", 
-                      calculate_change(latest_data['Employment_offered'], prev_data['Employment_offered']) if prev_data is not None else None)
-        with col4:
-            st.metric("Employment Availed", f"{latest_data['Employment_Availed']:,}", 
-                      calculate_change(latest_data['Employment_Availed'], prev_data['Employment_Availed']) if prev_data is not None else None)
+        @recorder.timed("metrics")
+        def show_metrics():
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("No. of Registered", f"{latest_data['No_of_Registered']:,}", 
+                          calculate_change(latest_data['No_of_Registered'], prev_data['No_of_Registered']) if prev_data is not None else None)
+            with col2:
+                st.metric("Employment Demanded", f"{latest_data['Employment_demanded']:,}", 
+                          calculate_change(latest_data['Employment_demanded'], prev_data['Employment_demanded']) if prev_data is not None else None)
+            with col3:
+                st.metric("Employment Offered", f"{latest_data['Employment_offered']:,}", 
+                          calculate_change(latest_data['Employment_offered'], prev_data['Employment_offered']) if prev_data is not None else None)
+            with col4:
+                st.metric("Employment Availed", f"{latest_data['Employment_Availed']:,}", 
+                          calculate_change(latest_data['Employment_Availed'], prev_data['Employment_Availed']) if prev_data is not None else None)
+
+        if latest_data is not None:
+            show_metrics()
 
        
-       # Tabs setup
-        tabs = st.tabs(["Summary Statistics", "APY Trends", "Harvest", "Mgnrega", "Conclusion"])
+       # Tabs setup: only the open tab's body runs, so each rerun pays for what is on screen
+        tabs = st.tabs(["Summary Statistics", "APY Trends", "Harvest", "Mgnrega", "Conclusion"], key="section", on_change="rerun")
+
+        # Crop picker shown in both APY Trends and Harvest. Widget state is dropped while no open tab
+        # renders it, so the last choice is kept under a separate key and restored.
+        def select_crop():
+            if "crop" not in st.session_state:
+                st.session_state["crop"] = st.session_state.get("selected_crop", "")
+            crop = st.selectbox("Select Crop:", [""] + artifacts.crop_names(crop_data), key="crop")
+            st.session_state["selected_crop"] = crop
+            return crop
 
         # Tab 1: APY TRENDS
-        with tabs[1]:
-            col1, col2 = st.columns(2)
+        if tabs[1].open:
+            with tabs[1], recorder.section("tab.APY Trends"):
+                col1, col2 = st.columns(2)
 
-            # First Column: MGNREGA Trends
+                # First Column: MGNREGA Trends
             
-            with col1:
-                crop = st.selectbox("Select Crop:", [""] + sorted(crop_data['Crop'].unique()))
+                with col1:
+                    crop = select_crop()
         
-        # Filter data based on selected crop and state (you've already filtered by state elsewhere)
-                if crop:
-                    state_crop_data = crop_data[(crop_data['State'] == state) & (crop_data['Crop'] == crop)]
+            # Filter data based on selected crop and state (you've already filtered by state elsewhere)
+                    if crop:
+                        state_crop_data = state_view["crops"].get(crop)
                     
-                    st.subheader("APY Trends")
-                    st.caption("Area,Production of Crops")
+                        st.subheader("APY Trends")
+                        st.caption("Area,Production of Crops")
                     
-                    if not state_crop_data.empty:
-                        fig = go.Figure()
-                        fig.add_trace(go.Scatter(x=state_crop_data['Crop_Year'], y=state_crop_data['Production_(in_Tonnes)'], mode='lines+markers', name='Production', line=dict(color='blue'),hovertemplate="<b>Year</b>: %{x}<br><b>Production</b>: %{y:,}<extra></extra>"))
-                        fig.add_trace(go.Scatter(x=state_crop_data['Crop_Year'], y=state_crop_data['Area_(in_Ha)'], mode='lines+markers', name='Area', line=dict(color='green'), yaxis='y2',hovertemplate="<b>Year</b>: %{x}<br><b>Area</b>: %{y:,}<extra></extra>"))
-
-                        fig.update_layout(
-                            xaxis_title='Year',
-                            yaxis_title='Production',
-                            yaxis2=dict(title='Area', overlaying='y', side='right'),
-                            legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
-                            margin=dict(l=0, r=0, t=0, b=0),
-                            height=400
-                        )
-
-                        st.plotly_chart(fig, use_container_width=True)
+                        if state_crop_data:
+                            fig = go.Figure()
+                            trends = state_crop_data["columns"]
+                            add_trend(fig, trends['Production_(in_Tonnes)'], 'Production', 'Production', 'blue')
+                            add_trend(fig, trends['Area_(in_Ha)'], 'Area', 'Area', 'green', yaxis='y2')
+
+                            fig.update_layout(
+                                xaxis_title='Year',
+                                yaxis_title='Production',
+                                yaxis2=dict(title='Area', overlaying='y', side='right'),
+                                legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
+                                margin=dict(l=0, r=0, t=0, b=0),
+                                height=400
+                            )
+
+                            plotly_chart(fig)
+                        else:
+                            st.info("No data available for the selected crop.")
                     else:
-                        st.info("No data available for the selected crop.")
-                else:
-                    st.info("Please select a crop to view the trends.")
-    # Second Column: Crop Production and Yield
-            with col2:
-                st.write("<br>", unsafe_allow_html=True)
-                st.write("<br>", unsafe_allow_html=True)
-                st.write("<br>", unsafe_allow_html=True)
+                        st.info("Please select a crop to view the trends.")
+        # Second Column: Crop Production and Yield
+                with col2:
+                    st.write("<br>", unsafe_allow_html=True)
+                    st.write("<br>", unsafe_allow_html=True)
+                    st.write("<br>", unsafe_allow_html=True)
                
-                if crop:
-                    state_crop_data = crop_data[(crop_data['State'] == state) & (crop_data['Crop'] == crop)]
-
-                    st.subheader("Crop Production and Yield")
-                    st.caption("Production,Yield of Crops")
-                    if not state_crop_data.empty:
-                        fig = go.Figure()
-                        fig.add_trace(go.Bar(x=state_crop_data['Crop_Year'], y=state_crop_data['Production_(in_Tonnes)'], name='Production',marker_color='#98FB98',hovertemplate="<b>Year</b>: %{x}<br><b>Production</b>: %{y:,}<extra></extra>"))
-                        fig.add_trace(go.Scatter(x=state_crop_data['Crop_Year'], y=state_crop_data['Yield_(kg/Ha)'], mode='lines+markers', name='Yield', yaxis='y2',line=dict(color='rgb(0,100,0)'),hovertemplate="<b>Year</b>: %{x}<br><b>Yield</b>: %{y:,}<extra></extra>"))
-
-                        fig.update_layout(
-                            title=f"Crop Production and Yield for {state}",
-                            xaxis_title="Year",
-                            yaxis_title="Production (Tonnes)",
-                            yaxis2=dict(title="Yield (kg/Ha)", overlaying='y', side='right'),
-                            margin=dict(l=0, r=0, t=0, b=0),
-                            height=400
-                        )
+                    if crop:
+                        state_crop_data = state_view["crops"].get(crop)
+
+                        st.subheader("Crop Production and Yield")
+                        st.caption("Production,Yield of Crops")
+                        if state_crop_data:
+                            fig = go.Figure()
+                            trends = state_crop_data["columns"]
+                            add_trend(fig, trends['Production_(in_Tonnes)'], 'Production', 'Production', '#98FB98', bar=True)
+                            add_trend(fig, trends['Yield_(kg/Ha)'], 'Yield', 'Yield', 'rgb(0,100,0)', yaxis='y2')
+
+                            fig.update_layout(
+                                title=f"Crop Production and Yield for {state}",
+                                xaxis_title="Year",
+                                yaxis_title="Production (Tonnes)",
+                                yaxis2=dict(title="Yield (kg/Ha)", overlaying='y', side='right'),
+                                margin=dict(l=0, r=0, t=0, b=0),
+                                height=400
+                            )
                         
-                        st.plotly_chart(fig, use_container_width=True)
+                            plotly_chart(fig)
 
 #------------------------------- Mean,Median,std ---------------------------------------------------------
 
-        def display_histograms(data, dataset_name, col1, col2):
-            numerical_columns = data.select_dtypes(include=['number']).columns
+        @recorder.timed("chart.histograms")
+        def display_histograms(summary, dataset_name, col1, col2):
+            numerical_columns = list(summary)
 
     # Split columns for two-column display
             mid = len(numerical_columns) // 2
             col_list_1 = numerical_columns[:mid]
             col_list_2 = numerical_columns[mid:]
-          
-
-            with col1:
-                for column in col_list_1:
-                    if not data[column].isnull().all():
-                        mean = data[column].mean()
-                        median = data[column].median()
-                        std_dev = data[column].std()
-
-                        st.subheader(f"{column}")
-                        fig, ax = plt.subplots(figsize=(8,4))
-                        
-                        # Plot histogram
-                        sns.histplot(data[column].dropna(), bins=20, kde=True, ax=ax, color='skyblue', edgecolor='black', alpha=0.7)
-
-                        # Generate values for Gaussian curve
-                        x = np.linspace(data[column].min(), data[column].max(), 100)
-                        gaussian_curve = norm.pdf(x, mean, std_dev) * len(data[column].dropna()) * (data[column].max() - data[column].min()) / 20  # Adjust scaling for bins
-                        
-                        # Plot Gaussian curve (Mean and Std Dev)
-                        ax.plot(x, gaussian_curve, color='red', linestyle='-', label=f"Gaussian Curve (Mean: {mean:.2f}, Std Dev: {std_dev:.2f})", linewidth=2)
 
-                        # Plot Median as a vertical line
-                        ax.axvline(median, color='green', linestyle='-', linewidth=2, label=f"Median: {median:.2f}")
-                        
-                        # Add legend
-                        ax.legend()
-
-                        # Display the plot in Streamlit
-                        st.pyplot(fig)
-
-            with col2:
-                for column in col_list_2:
-                    if not data[column].isnull().all():
-                        mean = data[column].mean()
-                        median = data[column].median()
-                        std_dev = data[column].std()
+            for container, col_list in ((col1, col_list_1), (col2, col_list_2)):
+                with container:
+                    for column in col_list:
+                        stats = summary[column]
 
                         st.subheader(f"{column}")
-                        fig, ax = plt.subplots(figsize=(8,4))
-
-                        # Plot histogram
-                        sns.histplot(data[column].dropna(), bins=20, kde=True, ax=ax, color='skyblue', edgecolor='black', alpha=0.7)
 
-                        # Generate values for Gaussian curve
-                        x = np.linspace(data[column].min(), data[column].max(), 100)
-                        gaussian_curve = norm.pdf(x, mean, std_dev) * len(data[column].dropna()) * (data[column].max() - data[column].min()) / 20  # Adjust scaling for bins
-                        
-                        # Plot Gaussian curve (Mean and Std Dev)
-                        ax.plot(x, gaussian_curve, color='red', linestyle='-', label=f"Gaussian Curve (Mean: {mean:.2f}, Std Dev: {std_dev:.2f})", linewidth=2)
-
-                        # Plot Median as a vertical line
-                        ax.axvline(median, color='green', linestyle='-', linewidth=2, label=f"Median: {median:.2f}")
-                        
-                        # Add legend
-                        ax.legend()
-
-                        # Display the plot in Streamlit
-                        st.pyplot(fig)
+                        # Display the cached PNG in Streamlit
+                        st.image(figure_cache.render((dataset_name, column, "histogram", data_version), lambda: charts.histogram_figure(stats)))
 
 # --------------- OUTLIERS -------------------------------------------
 
         # Function to create box plots for outliers
-        def create_box_plots(data, dataset_name, col1, col2):
-            numerical_columns = data.select_dtypes(include=['number']).columns
+        @recorder.timed("chart.box_plots")
+        def create_box_plots(outlier_result, dataset_name, col1, col2):
+            box_stats, outlier_rows = outlier_result
+            numerical_columns = list(box_stats.index)
 
     # Split the columns for two-column display
             mid = len(numerical_columns) // 2
             col_list_1 = numerical_columns[:mid]
             col_list_2 = numerical_columns[mid:]
 
-            with col1:
-                for column in col_list_1:
-                    if not data[column].isnull().all():  # Check if the column has valid data
-                        st.subheader(f"{column} Outliers - {dataset_name}")
-                        fig = px.box(data, y=column, title=f"Outliers in {column}")
-                        st.plotly_chart(fig, use_container_width=True)
+            for container, col_list in ((col1, col_list_1), (col2, col_list_2)):
+                with container:
+                    for column in col_list:
+                        stats = box_stats.loc[column]
+                        points = outlier_rows.loc[outlier_rows['column'] == column, 'value']
 
-            with col2:
-                for column in col_list_2:
-                    if not data[column].isnull().all():  # Check if the column has valid data
+                        # Box from the precomputed quartiles/whiskers; only the outliers are sent as points
                         st.subheader(f"{column} Outliers - {dataset_name}")
-                        fig = px.box(data, y=column, title=f"Outliers in {column}")
-                        st.plotly_chart(fig, use_container_width=True)
+                        fig = go.Figure()
+                        fig.add_trace(go.Box(x=[column], q1=[stats['q1']], median=[stats['median']], q3=[stats['q3']],
+                                             lowerfence=[stats['whisker_low']], upperfence=[stats['whisker_high']],
+                                             name=column, boxpoints=False, marker_color='#636efa'))
+                        fig.add_trace(go.Scatter(x=[column] * len(points), y=points, mode='markers', name='Outliers',
+                                                 marker=dict(color='#636efa', size=5), showlegend=False))
+                        fig.update_layout(title=f"Outliers in {column}", yaxis_title=column, showlegend=False)
+                        plotly_chart(fig)
 
 # ---------------- QQ PLOT ------------------------------------
-        def create_qq_plots(data, dataset_name, col1, col2):
-            numerical_columns = data.select_dtypes(include=['number']).columns
+        @recorder.timed("chart.qq_plots")
+        def create_qq_plots(qq_data, dataset_name, col1, col2):
+            numerical_columns = list(qq_data)
 
             # Split columns for two-column display
             mid = len(numerical_columns) // 2
             col_list_1 = numerical_columns[:mid]
             col_list_2 = numerical_columns[mid:]
 
-            with col1:
-                for column in col_list_1:
-                    if not data[column].isnull().all():  # Check if the column has valid data
+            for container, col_list in ((col1, col_list_1), (col2, col_list_2)):
+                with container:
+                    for column in col_list:
+                        qq = qq_data[column]
                         st.subheader(f"{column} Normality Check (QQ Plot) - {dataset_name}")
-                        fig, ax = plt.subplots(figsize=(6,3))
-                        sm.qqplot(data[column], line='s', ax=ax)
-                        st.pyplot(fig)
+                        st.caption(f"Shapiro-Wilk W = {qq['shapiro_w']:.3f} (p = {qq['shapiro_p']:.3g}) • Anderson-Darling A² = {qq['anderson_a2']:.3f} (p = {qq['anderson_p']:.3g}) • n = {qq['n']:,}")
 
-            with col2:
-                for column in col_list_2:
-                    if not data[column].isnull().all():  # Check if the column has valid data
-                        st.subheader(f"{column} Normality Check (QQ Plot) - {dataset_name}")
-                        fig, ax = plt.subplots(figsize=(6,3))
-                        sm.qqplot(data[column], line='s', ax=ax)
-                        st.pyplot(fig)
+                        st.image(figure_cache.render((dataset_name, column, "qq", data_version), lambda: charts.qq_figure(qq)))
 
 
-        def create_correlation_plot(data, selected_columns, col1, col2, method='spearman'):
+        @recorder.timed("chart.correlation")
+        def create_correlation_plot(correlations, selected_columns, col1, col2, method='spearman'):
                                 if len(selected_columns) >= 2:
-                                    data = data[selected_columns]
-                                    corr_matrix = data.corr(method=method)
-                            
-                            # Plot the correlation matrix
-                                    fig, ax = plt.subplots(figsize=(10, 8))
-                                    sns.heatmap(corr_matrix, annot=True, cmap='viridis', vmin=-1, vmax=1, ax=ax, fmt='.2f', cbar=True)
-                                    plt.title(f"Spearman Correlation Matrix ({method.capitalize()})", pad=20)
+                                    def draw():
+                                        # Submatrix of the precomputed correlation matrix
+                                        return charts.correlation_figure(correlations.corr(selected_columns, method), method)
+
                                     with col1:
-                                        st.pyplot(fig)
+                                        st.image(figure_cache.render(("State-Year Panel", tuple(selected_columns), f"correlation-{method}", data_version), draw))
+                                    with col2:
+                                        st.write("p-values:")
+                                        st.dataframe(correlations.p_values(selected_columns, method).style.format("{:.4f}"))
                                 else:
                                     st.info("Please select at least two columns to display correlation.")
 
 # Tab 2: PRICE ANALYSIS INSIGHTS
-        with tabs[0]:
-            st.subheader("Summary Statistics • Outliers • Normal Distribution • Correlation Analysis")
-            analysis_type = st.selectbox("Select Analysis", ["Mean, Median, Std Dev", "Outliers", "QQ Plot","Correlation Analysis" ])
-
-            if analysis_type != "Selwect an Option":
-                col1, col2 = st.columns(2)
-
-            # Display the selected type of analysis
-                if analysis_type == "Mean, Median, Std Dev":
-                    display_histograms(crop_data, "Crop Data", col1, col2)
-                    display_histograms(mgnrega, "Production Data", col1, col2)
-                    display_histograms(area_affected, "Area Data", col1, col2)
-
-                elif analysis_type == "Outliers":
-                    create_box_plots(crop_data, "Crop Data", col1, col2)
-                    create_box_plots(mgnrega, "Production Data", col1, col2)
-                    create_box_plots(area_affected, "Area Data", col1, col2)
-
-                elif analysis_type == "QQ Plot":
-                    create_qq_plots(crop_data, "Crop Data", col1, col2)
-                    create_qq_plots(mgnrega, "Production Data", col1, col2)
-                    create_qq_plots(area_affected, "Area Data", col1, col2)
-                elif analysis_type == "Correlation Analysis":
-                    all_datasets = {
-                        "Crop Data": crop_data,
-                        "Dataset 2": mgnrega,
-                        "Dataset 3": area_affected
-                        }
-
-            # Combine all datasets into one DataFrame
-                    combined_data = pd.concat(all_datasets.values(), axis=1)
-
-            # Dropdown to select columns for correlation
-                    numerical_columns = combined_data.select_dtypes(include=['number']).columns
-                    selected_columns = st.multiselect("Select Columns to Correlate:", numerical_columns)
+        if tabs[0].open:
+            with tabs[0], recorder.section("tab.Summary Statistics"):
+                st.subheader("Summary Statistics • Outliers • Normal Distribution • Correlation Analysis")
+                analysis_type = st.selectbox("Select Analysis", ["Mean, Median, Std Dev", "Outliers", "QQ Plot","Correlation Analysis" ])
 
+                if analysis_type != "Selwect an Option":
                     col1, col2 = st.columns(2)
 
-            # Create correlation plot
-                    create_correlation_plot(combined_data, selected_columns, col1, col2)
-            else:
-                st.info("Please select an analysis type from the dropdown.")
+                # Display the selected type of analysis
+                    if analysis_type == "Mean, Median, Std Dev":
+                        summaries = load_summaries(data_version)
+                        display_histograms(summaries["Crop Data"], "Crop Data", col1, col2)
+                        display_histograms(summaries["Production Data"], "Production Data", col1, col2)
+                        display_histograms(summaries["Area Data"], "Area Data", col1, col2)
+
+                    elif analysis_type == "Outliers":
+                        outliers = load_outliers(data_version)
+                        all_outliers = pd.concat([rows.assign(dataset=name) for name, (_, rows) in outliers.items()], ignore_index=True)
+                        st.download_button("Download outlier table (CSV)", all_outliers.to_csv(index=False), file_name="outliers.csv", mime="text/csv")
+
+                        create_box_plots(outliers["Crop Data"], "Crop Data", col1, col2)
+                        create_box_plots(outliers["Production Data"], "Production Data", col1, col2)
+                        create_box_plots(outliers["Area Data"], "Area Data", col1, col2)
+
+                    elif analysis_type == "QQ Plot":
+                        qq_data = load_qq_points(data_version)
+                        create_qq_plots(qq_data["Crop Data"], "Crop Data", col1, col2)
+                        create_qq_plots(qq_data["Production Data"], "Production Data", col1, col2)
+                        create_qq_plots(qq_data["Area Data"], "Area Data", col1, col2)
+                    elif analysis_type == "Correlation Analysis":
+                        # Crop aggregates, MGNREGA and Area_affected joined on (State, year)
+                        correlations = load_correlations(data_version)
+
+                # Dropdown to select columns for correlation
+                        selected_columns = st.multiselect("Select Columns to Correlate:", correlations.columns)
+                        method = st.radio("Method:", ["spearman", "pearson"], horizontal=True, format_func=str.capitalize)
+
+                        col1, col2 = st.columns(2)
+
+                # Create correlation plot
+                        create_correlation_plot(correlations, selected_columns, col1, col2, method)
+                else:
+                    st.info("Please select an analysis type from the dropdown.")
 
 #----------------------- HARVEST PRICE --------------------------------------------------------
 
-        with tabs[2]:
-            col1, col2 = st.columns(2)
+        if tabs[2].open:
+            with tabs[2], recorder.section("tab.Harvest"):
+                col1, col2 = st.columns(2)
 
-    # First Column: MGNREGA Trends
-            with col2:
-                st.subheader("Price Trends")
+        # First Column: MGNREGA Trends
+                with col2:
+                    st.subheader("Price Trends")
+                    crop = select_crop()
 
-                if crop and state:
-                    state_crop_data = crop_data[(crop_data['State'] == state) & (crop_data['Crop'] == crop)]
+                    if crop and state:
+                        state_crop_data = state_view["crops"].get(crop)
 
-                    st.subheader("")
-                    st.caption("Cost Production vs Harvest Price")
+                        st.subheader("")
+                        st.caption("Cost Production vs Harvest Price")
                     
 
-                    if not state_crop_data.empty:
-                        fig = go.Figure()
-                        fig.add_trace(go.Scatter(x=state_crop_data['Crop_Year'], y=state_crop_data['cost_of_prod'], mode='lines+markers', name='Production_Cost', line=dict(color='blue'), hovertemplate="<b>Year</b>: %{x}<br><b>Production Cost</b>: %{y:,}<extra></extra>"))
-                        fig.add_trace(go.Scatter(x=state_crop_data['Crop_Year'], y=state_crop_data['Harvest_Price'], mode='lines+markers', name='Harvest Price', line=dict(color='green'), yaxis='y2', hovertemplate="<b>Year</b>: %{x}<br><b>Harvest Price</b>: %{y:,}<extra></extra>"))
-
-                        fig.update_layout(
-                            xaxis_title='Year',
-                            yaxis_title='Production',
-                            yaxis2=dict(title='Area', overlaying='y', side='right'),
-                            legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
-                            margin=dict(l=0, r=0, t=0, b=0),
-                            height=400
-                        )
-
-                        st.plotly_chart(fig, use_container_width=True)
+                        if state_crop_data:
+                            fig = go.Figure()
+                            trends = state_crop_data["columns"]
+                            add_trend(fig, trends['cost_of_prod'], 'Production_Cost', 'Production Cost', 'blue')
+                            add_trend(fig, trends['Harvest_Price'], 'Harvest Price', 'Harvest Price', 'green', yaxis='y2')
+
+                            fig.update_layout(
+                                xaxis_title='Year',
+                                yaxis_title='Production',
+                                yaxis2=dict(title='Area', overlaying='y', side='right'),
+                                legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
+                                margin=dict(l=0, r=0, t=0, b=0),
+                                height=400
+                            )
+
+                            plotly_chart(fig)
+
+                            # Wholesale Price Index of the crop (dataset1.csv), joined into the same panel rows
+                            if trends['WPI']['y']:
+                                st.caption("Wholesale Price Index")
+                                fig = go.Figure()
+                                add_trend(fig, trends['WPI'], 'WPI', 'WPI', 'purple')
+                                fig.update_layout(xaxis_title='Year', yaxis_title='WPI', margin=dict(l=0, r=0, t=0, b=0), height=250)
+                                plotly_chart(fig)
+                        else:
+                            st.info("No data available for the selected crop.")
                     else:
-                        st.info("No data available for the selected crop.")
-                else:
-                    st.info("Please select a crop and state to view the trends.")
-
-            # Second Column: Feature Importance
-            with col1:
-                st.subheader("Cost Production and Harvest Price")
-                st.caption("Feature Importance")
-
-                # Identify categorical columns and the 'Crop_Year' column
-                categorical_cols = crop_data.select_dtypes(include=['object']).columns
-                year_col = 'Crop_Year'
-
-                # Create a list of columns to scale (exclude categorical and Crop_Year columns)
-                cols_to_scale = [col for col in crop_data.columns if col not in categorical_cols and col != year_col and col != 'Harvest_Price']
-
-                # Apply Min-Max scaling
-                scaler = MinMaxScaler()
-                crop_data[cols_to_scale] = scaler.fit_transform(crop_data[cols_to_scale])
-
-                # Initialize a dictionary to store feature importances for each year
-                feature_importance_dict = {}
-
-                # Separate the dataset by Crop_Year
-                grouped = crop_data.groupby('Crop_Year')
-
-                for year, group in grouped:
-                    # Separate features (X) and target (y)
-                    X = group[cols_to_scale]  # All columns except 'Crop_Year', categorical, and 'Harvest_Price'
-                    y = group['Harvest_Price']  # Use 'Harvest_Price' as the target variable
-                    
-                    # Train Random Forest model
-                    rf = RandomForestRegressor(n_estimators=100, random_state=42)
-                    rf.fit(X, y)
-                    
-                    # Get feature importance for the current year
-                    feature_importance = rf.feature_importances_
-                    feature_importance_dict[year] = feature_importance
-
-                # Plot feature importance for each year
-                plt.figure(figsize=(14, 8))
-                feature_names = cols_to_scale
-                for i, year in enumerate(sorted(feature_importance_dict.keys())):
-                    plt.bar([f"{feature}\n{year}" for feature in feature_names], feature_importance_dict[year], alpha=0.7, label=f"Year {year}")
-
-               
-                plt.xlabel('Features and Year', fontsize=14)
-                plt.ylabel('Feature Importance', fontsize=14)
-                plt.xticks(rotation=90, fontsize=10)
-                plt.yticks(fontsize=12)
-                plt.grid(axis='y', linestyle='--', alpha=0.7)
-                plt.legend(title='Year')
-
-                st.pyplot(plt.gcf())
-                plt.close()
+                        st.info("Please select a crop and state to view the trends.")
+
+                # Second Column: Feature Importance
+                with col1:
+                    st.subheader("Cost Production and Harvest Price")
+                    st.caption("Feature Importance")
+
+                    # One Random Forest per Crop_Year predicting 'Harvest_Price' from the other numeric crop columns
+                    feature_names = artifacts.harvest_feature_columns(crop_data)
+
+                    def draw():
+                        return charts.importance_bar_figure(load_importances(data_version, "harvest"), feature_names)
+
+                    st.image(figure_cache.render(("Crop Data", "Harvest_Price", "feature_importance", data_version), draw))
+
+                # What-if scenarios: the stored per-year forests predict 'Harvest_Price' for changed inputs, all scenarios in one batch
+                with st.expander("What-if: Harvest Price under changed inputs"):
+                    model_years = sorted(load_importances(data_version, "harvest"))
+                    with st.form("what_if"):
+                        what_if_year = st.selectbox("Model year:", model_years, index=len(model_years) - 1)
+                        changes = st.data_editor(pd.DataFrame(WHAT_IF_DEFAULT_CHANGES), num_rows="dynamic", key="what_if_changes", column_config={
+                            "scenario": st.column_config.TextColumn("Scenario", required=True),
+                            "feature": st.column_config.SelectboxColumn("Feature", options=feature_names, required=True),
+                            "change_pct": st.column_config.NumberColumn("Change %", format="%.1f", required=True),
+                            "state": st.column_config.SelectboxColumn("State (blank = all)", options=[""] + sorted(mgnrega['State'].unique())),
+                        })
+                        submitted = st.form_submit_button("Predict")
+                    if submitted:
+                        try:
+                            with recorder.section("model.predict.harvest"):
+                                st.session_state["what_if_predictions"] = artifacts.harvest_what_if(crop_data, load_models(data_version, "harvest"), changes, int(what_if_year))
+                        except ValueError as error:
+                            st.error(f"Could not run the scenarios: {error}")
+                    predictions = st.session_state.get("what_if_predictions")
+                    if predictions is not None:
+                        st.caption("Mean predicted Harvest Price across all states and crops")
+                        st.dataframe(scenario_summary(predictions), column_config={"change_pct": st.column_config.NumberColumn("Change %", format="%.2f")})
+                        if state:
+                            st.caption(f"Predicted Harvest Price in {state}")
+                            state_rows = predictions[predictions["State"] == state]
+                            table = state_rows.pivot_table(index="Crop", columns="scenario", values="predicted", observed=True, sort=False)
+                            st.dataframe(state_rows.groupby("Crop", observed=True)["baseline"].first().to_frame().join(table))
             
 
 #-------------------------------------- EMPLOYMENT DEMANDED---------------------------
 
-        def scale_data(df):
-            target_cols = ['Rural_Population', 'No_of_Registered', 'Employment_demanded', 'Employment_offered', 'Employment_Availed']
-            
-            # Apply Min-Max scaling
-            scaler = MinMaxScaler()
-            df[target_cols] = scaler.fit_transform(df[target_cols])
-            
-            return df
-
-       
-        scaled_mgnrega = scale_data(mgnrega)
-
         # Streamlit app
 
-        with tabs[3]:
-            col1, col2 = st.columns(2)
-
-            # First Column: Employment Trends
-            with col1:
-                st.subheader("Employment Trends")
-                st.caption("Employment Demanded vs Employment Offered")
-                year = st.selectbox("Select Year:", sorted(scaled_mgnrega['year'].unique()))
-
-                if state:
-                    state_data = scaled_mgnrega[scaled_mgnrega['State'] == state]
+        if tabs[3].open:
+            with tabs[3], recorder.section("tab.Mgnrega"):
+                col1, col2 = st.columns(2)
 
-                    if not state_data.empty:
-                        fig = go.Figure()
-                        fig.add_trace(go.Scatter(
-                            x=state_data['year'], 
-                            y=state_data['Employment_demanded'], 
-                            mode='lines+markers', 
-                            name='Employment Demanded', 
-                            line=dict(color='blue'), 
-                            hovertemplate="<b>Year</b>: %{x}<br><b>Employment Demanded</b>: %{y:,}<extra></extra>"
-                        ))
-                        fig.add_trace(go.Scatter(
-                            x=state_data['year'], 
-                            y=state_data['Employment_offered'], 
-                            mode='lines+markers', 
-                            name='Employment Offered', 
-                            line=dict(color='green'), 
-                            hovertemplate="<b>Year</b>: %{x}<br><b>Employment Offered</b>: %{y:,}<extra></extra>"
-                        ))
-
-                        fig.update_layout(
-                            xaxis_title='Year',
-                            yaxis_title='Employment Demanded',
-                            legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
-                            margin=dict(l=0, r=0, t=0, b=0),
-                            height=400
-                        )
-
-                        st.plotly_chart(fig, use_container_width=True)
+                # First Column: Employment Trends
+                with col1:
+                    st.subheader("Employment Trends")
+                    st.caption("Employment Demanded vs Employment Offered")
+                    year = st.selectbox("Select Year:", sorted(mgnrega['year'].unique()))
+
+                    if state:
+                        # Scaled MGNREGA series for the state; mgnrega itself is never rescaled
+                        state_data = state_view["employment"]
+
+                        if state_data['points']:
+                            fig = go.Figure()
+                            add_trend(fig, state_data['columns']['Employment_demanded'], 'Employment Demanded', 'Employment Demanded', 'blue')
+                            add_trend(fig, state_data['columns']['Employment_offered'], 'Employment Offered', 'Employment Offered', 'green')
+
+                            fig.update_layout(
+                                xaxis_title='Year',
+                                yaxis_title='Employment Demanded',
+                                legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
+                                margin=dict(l=0, r=0, t=0, b=0),
+                                height=400
+                            )
+
+                            plotly_chart(fig)
+                        else:
+                            st.info("No data available for the selected state.")
                     else:
-                        st.info("No data available for the selected state.")
-                else:
-                    st.info("Please select a state to view the trends.")
+                        st.info("Please select a state to view the trends.")
 
-            # Second Column: Feature Importance as Pie Chart
-            with col2:
-                st.subheader("Feature Importance")
+                # Second Column: Feature Importance as Pie Chart
+                with col2:
+                    st.subheader("Feature Importance")
                 
-                if year:
-                    year_df = scaled_mgnrega[scaled_mgnrega['year'] == year]
-                    feature_cols = ['Rural_Population', 'No_of_Registered', 'Employment_demanded', 'Employment_offered']
-                    target_col = 'Employment_Availed'
-                    
-                    X = year_df[feature_cols]
-                    y = year_df[target_col]
-                    
-                    model = RandomForestRegressor()
-                    model.fit(X, y)
-                    
-                    importances = model.feature_importances_
-                    features = X.columns
-                    colors = [ '#eb5f1a','#f6a417', '#66c6de', '#fecf16']
-
-# Ensure the color palette length matches the number of features
-                    color_palette = colors[:len(features)]  # This trims the color palette if there are fewer features than colors
-
-                    # Plot feature importance as a pie chart
-                    fig, ax = plt.subplots(figsize=(8, 8))
-                    ax.pie(importances, labels=features, autopct='%1.1f%%', startangle=90, colors=color_palette)
-                    ax.axis('equal')
-                    st.pyplot(fig)
-                else:
-                    st.info("Please select a year to view the feature importance.")
+                    if year:
+                        def draw():
+                            # Cached per-year models (all years at once, so switching year is a lookup)
+                            importances = load_importances(data_version, "mgnrega")[int(year)]
+                            return charts.importance_pie_figure(importances, artifacts.MGNREGA_FEATURES)
 
-        with tabs[4]:
-            st.info("* **Feature Importance Distribution :** Feature Importance is done using Random forest Regressor ,Features consistently ranked highly over multiple years strongly influence the target variable (msp , production ,yield). Variability in importance suggests changes in external factors .")
-            st.info("* **Year-wise Comparison :** A consistent feature importance across multiple years suggests that the relationship between input features and the target variable remains relatively stable, indicating the model is effectively capturing long-term trends. On the other hand, significant year-over-year changes in feature importance may imply the model needs to adjust to new patterns, such as evolving agricultural practices or changing market conditions.")
-            st.info("* **Impact on Decision-Making :** If features like Employment Availed or Employment Offered grow in importance, it signals a stronger influence of labor factors on outcomes, guiding decision-makers to focus on related policies. Conversely, decreasing importance of certain features suggests they may be losing relevance, warranting a review of their role in decision-making and modeling.")
+                        st.image(figure_cache.render(("Production Data", int(year), "feature_importance", data_version), draw))
+                    else:
+                        st.info("Please select a year to view the feature importance.")
+
+                # What-if scenarios: the stored per-year forests predict 'Employment_Availed' for changed inputs, all scenarios in one batch
+                with st.expander("What-if: Employment Availed under changed inputs"):
+                    model_years = sorted(load_importances(data_version, "mgnrega"))
+                    with st.form("mgnrega_what_if"):
+                        what_if_year = st.selectbox("Model year:", model_years, index=len(model_years) - 1, key="mgnrega_what_if_year")
+                        changes = st.data_editor(pd.DataFrame(MGNREGA_WHAT_IF_DEFAULT_CHANGES), num_rows="dynamic", key="mgnrega_what_if_changes", column_config={
+                            "scenario": st.column_config.TextColumn("Scenario", required=True),
+                            "feature": st.column_config.SelectboxColumn("Feature", options=artifacts.MGNREGA_FEATURES, required=True),
+                            "change_pct": st.column_config.NumberColumn("Change %", format="%.1f", required=True),
+                            "state": st.column_config.SelectboxColumn("State (blank = all)", options=[""] + sorted(mgnrega['State'].unique())),
+                        })
+                        submitted = st.form_submit_button("Predict")
+                    if submitted:
+                        try:
+                            with recorder.section("model.predict.mgnrega"):
+                                st.session_state["mgnrega_what_if_predictions"] = artifacts.mgnrega_what_if(mgnrega, load_models(data_version, "mgnrega"), changes, int(what_if_year))
+                        except ValueError as error:
+                            st.error(f"Could not run the scenarios: {error}")
+                    predictions = st.session_state.get("mgnrega_what_if_predictions")
+                    if predictions is not None:
+                        st.caption("Mean predicted Employment Availed across all states")
+                        st.dataframe(scenario_summary(predictions), column_config={"change_pct": st.column_config.NumberColumn("Change %", format="%.2f")})
+                        if state:
+                            st.caption(f"Predicted Employment Availed in {state}")
+                            state_rows = predictions[predictions["State"] == state]
+                            st.dataframe(state_rows.set_index("scenario")[["baseline", "predicted", "change_pct"]],
+                                         column_config={"change_pct": st.column_config.NumberColumn("Change %", format="%.2f")})
+
+        if tabs[4].open:
+            with tabs[4], recorder.section("tab.Conclusion"):
+                st.info("* **Feature Importance Distribution :** Feature Importance is done using Random forest Regressor ,Features consistently ranked highly over multiple years strongly influence the target variable (msp , production ,yield). Variability in importance suggests changes in external factors .")
+                st.info("* **Year-wise Comparison :** A consistent feature importance across multiple years suggests that the relationship between input features and the target variable remains relatively stable, indicating the model is effectively capturing long-term trends. On the other hand, significant year-over-year changes in feature importance may imply the model needs to adjust to new patterns, such as evolving agricultural practices or changing market conditions.")
+                st.info("* **Impact on Decision-Making :** If features like Employment Availed or Employment Offered grow in importance, it signals a stronger influence of labor factors on outcomes, guiding decision-makers to focus on related policies. Conversely, decreasing importance of certain features suggests they may be losing relevance, warranting a review of their role in decision-making and modeling.")
 else:
     st.info("Please select a State and View option to display the dashboard.")
+
+recorder.observe("script.run", time.perf_counter() - run_started)
+
+# Hidden diagnostics panel: open the app with ?diagnostics=1
+if st.query_params.get("diagnostics"):
+    with st.expander("Diagnostics", expanded=True):
+        snapshot = recorder.snapshot()
+        st.caption(f"Counters since {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(snapshot['started']))}"
+                   + ("" if snapshot["tracing_memory"] else " • set DASHBOARD_TRACE_MEMORY=1 for allocation figures"))
+        sections = pd.DataFrame.from_dict(snapshot["sections"], orient="index").sort_values("seconds_total", ascending=False)
+        sections["seconds_mean"] = sections["seconds_total"] / sections["calls"]
+        st.dataframe(sections)
+        st.dataframe(pd.DataFrame.from_dict(snapshot["caches"], orient="index"))
+        st.json(snapshot["gauges"])
+        col1, col2, col3 = st.columns(3)
+        col1.download_button("Download JSON", recorder.to_json(), file_name="dashboard-metrics.json", mime="application/json")
+        col2.download_button("Download Prometheus text", recorder.to_prometheus(), file_name="dashboard.prom", mime="text/plain")
+        if col3.button("Reset counters"):
+            recorder.reset()
+
+# Export after every run for scraping (e.g. node_exporter's textfile collector)
+if os.environ.get("DASHBOARD_METRICS_DIR"):
+    recorder.export(os.environ["DASHBOARD_METRICS_DIR"])
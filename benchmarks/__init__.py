@@ -0,0 +1 @@
+"""Synthetic-scale benchmarks for the dashboard's data and model paths."""
@@ -0,0 +1,205 @@
+"""Time the dashboard's data and model paths on synthetic data and compare against baselines.
+
+    python -m benchmarks.bench                          # default sizes, compare to baselines.json
+    python -m benchmarks.bench --rows 10000000 --stages load_csv load_cached filter
+    python -m benchmarks.bench --update-baseline        # record the current numbers
+
+Each stage runs headlessly (no Streamlit) against its own cache directory, so
+results never mix with the app's .cache/. Each stage runs twice: once for the
+wall time and once under tracemalloc for the peak memory, since tracing slows
+Python-heavy code (matplotlib) several times over. The peak covers NumPy/pandas
+buffers but not memory-mapped files or Arrow's own allocator.
+
+The exit status is 1 when any stage is slower or uses more memory than its
+baseline by more than the tolerance.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks import synthetic
+from dashboard import artifacts, charts, importance, loader
+from dashboard.figures import figure_png
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+DATA_ROOT = os.path.join(loader.CACHE_DIR, "benchmarks")
+DEFAULT_ROWS = [3_000, 30_000, 300_000]
+# Per-state work is measured on this many states, like a burst of users picking different states
+FILTER_STATES = 100
+
+
+def stage_load_csv(ctx):
+    # Cold start: parse the CSVs and write a fresh columnar cache
+    ctx["cache_dir"] = tempfile.mkdtemp(dir=ctx["cache_root"])
+    ctx["frames"] = loader.load_all(ctx["data_dir"], ctx["cache_dir"])
+    ctx["wpi"] = loader.load_table("wpi", ctx["data_dir"], ctx["cache_dir"])
+
+
+def stage_load_cached(ctx):
+    # Warm start: memory-map the columnar cache
+    ctx["frames"] = loader.load_all(ctx["data_dir"], ctx["cache_dir"])
+    ctx["wpi"] = loader.load_table("wpi", ctx["data_dir"], ctx["cache_dir"])
+
+
+def stage_panel(ctx):
+    # The unified (State, Crop, year) panel, built once per data version in the app
+    ctx["panel"] = artifacts.unified_panel(*ctx["frames"], ctx["wpi"])
+
+
+def _panel(ctx):
+    if "panel" not in ctx:
+        stage_panel(ctx)
+    return ctx["panel"]
+
+
+def stage_filter(ctx):
+    crop_data, area_affected, mgnrega = ctx["frames"]
+    panel = _panel(ctx)
+    mgnrega_scaled = artifacts.scaled_index(artifacts.scaled_views(mgnrega))
+    for state in panel.states[:FILTER_STATES]:
+        artifacts.state_view(state, panel, mgnrega_scaled)
+
+
+def stage_histograms(ctx):
+    # Summary statistics plus the histogram figure of every numeric column
+    summaries = artifacts.summaries(artifacts.dataset_frames(*ctx["frames"]))
+    for summary in summaries.values():
+        for stats in summary.values():
+            figure_png(charts.histogram_figure(stats))
+
+
+def stage_correlation(ctx):
+    correlations = artifacts.correlations(_panel(ctx))
+    correlations.corr(correlations.columns)
+
+
+def stage_importance(ctx):
+    # The Harvest tab's per-year forests, trained from scratch (no memory or disk cache hits)
+    crop_data = ctx["frames"][0]
+    importance._memo.clear()
+    importance.yearly_feature_importance(crop_data, artifacts.harvest_feature_columns(crop_data), artifacts.HARVEST_TARGET,
+                                         artifacts.HARVEST_YEAR, n_jobs=ctx["n_jobs"], cache_dir=tempfile.mkdtemp(dir=ctx["cache_dir"]))
+
+
+STAGES = {
+    "load_csv": stage_load_csv,
+    "load_cached": stage_load_cached,
+    "panel": stage_panel,
+    "filter": stage_filter,
+    "histograms": stage_histograms,
+    "correlation": stage_correlation,
+    "importance": stage_importance,
+}
+
+
+def measure(stage, ctx, memory=True):
+    """{seconds, peak_mb} for ``stage``; peak_mb is None when ``memory`` is off."""
+    gc.collect()
+    start = time.perf_counter()
+    stage(ctx)
+    result = {"seconds": round(time.perf_counter() - start, 4), "peak_mb": None}
+
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            stage(ctx)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        result["peak_mb"] = round(peak / 2**20, 2)
+    return result
+
+
+def run(rows, stages, seed=0, n_jobs=-1, memory=True, data_root=DATA_ROOT):
+    """{stage: {seconds, peak_mb}} for one synthetic size. ``load_csv`` always runs first."""
+    data_dir = synthetic.ensure_dataset(rows, seed, data_root)
+    cache_root = tempfile.mkdtemp(prefix="cache-", dir=data_root)
+    ctx = {"data_dir": data_dir, "cache_root": cache_root, "n_jobs": n_jobs}
+    try:
+        results = {"load_csv": measure(stage_load_csv, ctx, memory)}
+        for name in stages:
+            if name != "load_csv":
+                results[name] = measure(STAGES[name], ctx, memory)
+    finally:
+        shutil.rmtree(cache_root, ignore_errors=True)
+    return {name: results[name] for name in stages}
+
+
+def compare(results, baseline, time_tolerance, memory_tolerance):
+    """(rows, stage, metric, value, baseline) for every metric past its tolerance."""
+    regressions = []
+    for rows, stages in results.items():
+        for stage, metrics in stages.items():
+            expected = baseline.get(rows, {}).get(stage)
+            if expected is None:
+                continue
+            for metric, tolerance in (("seconds", time_tolerance), ("peak_mb", memory_tolerance)):
+                if metrics[metric] is None or expected.get(metric) is None:
+                    continue
+                if metrics[metric] > expected[metric] * (1 + tolerance):
+                    regressions.append((rows, stage, metric, metrics[metric], expected[metric]))
+    return regressions
+
+
+def load_baselines(path=BASELINE_PATH):
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except OSError:
+        return {"machine": {}, "results": {}}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS, help="Crop_data rows per run (default: %(default)s)")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--n-jobs", type=int, default=-1, help="joblib workers for the importance stage")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass (halves the run time)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--time-tolerance", type=float, default=0.5, help="allowed slowdown as a fraction (default: %(default)s)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.2, help="allowed memory growth as a fraction (default: %(default)s)")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for rows in args.rows:
+        results[str(rows)] = run(rows, args.stages, args.seed, args.n_jobs, memory=not args.no_memory)
+        for stage, metrics in results[str(rows)].items():
+            peak = "-" if metrics["peak_mb"] is None else f"{metrics['peak_mb']:.1f}"
+            print(f"{rows:>12,} rows  {stage:<12} {metrics['seconds']:>10.3f}s {peak:>10} MB", flush=True)
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+    baselines = load_baselines(args.baseline)
+    if args.update_baseline:
+        for rows, stages in results.items():
+            for stage, metrics in stages.items():
+                previous = baselines["results"].setdefault(rows, {}).get(stage, {})
+                baselines["results"][rows][stage] = {k: v if v is not None else previous.get(k) for k, v in metrics.items()}
+        baselines["machine"] = {"platform": platform.platform(), "python": platform.python_version(), "cpus": os.cpu_count()}
+        with open(args.baseline, "w") as fh:
+            json.dump(baselines, fh, indent=2, sort_keys=True)
+            fh.write("\n")
+        print(f"Updated {args.baseline}")
+        return 0
+
+    regressions = compare(results, baselines["results"], args.time_tolerance, args.memory_tolerance)
+    for rows, stage, metric, value, expected in regressions:
+        print(f"REGRESSION {rows} rows {stage}: {metric} {value} vs baseline {expected}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
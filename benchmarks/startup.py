@@ -0,0 +1,74 @@
+"""Check a fresh worker's time to first paint against a startup budget.
+
+    python -m benchmarks.startup                      # Data view, default budget
+    python -m benchmarks.startup --view Visualization --budget 20
+
+Each run starts a new Python process, renders the app once headlessly with
+Streamlit's AppTest for one state and view, and reports the wall time from
+process start plus the heavy analytics modules that were imported on the way.
+The Data view only needs pandas, so it must not import any of them.
+
+The exit status is 1 when the time is over budget or a view that should not
+need a heavy module imports one.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Streamlit.py")
+HEAVY_MODULES = ["scipy", "sklearn", "statsmodels", "matplotlib", "seaborn"]
+# Views that must render without any of HEAVY_MODULES
+LIGHT_VIEWS = ["", "Data"]
+DEFAULT_BUDGET = 3.0
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file({app!r}, default_timeout=600)
+app.run()
+app.selectbox[0].select({state!r})
+app.selectbox[1].select({view!r})
+app.run()
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "errors": [str(e.message) for e in app.exception],
+    "heavy_modules": sorted(m for m in {heavy!r} if m in sys.modules),
+}}))
+"""
+
+
+def probe(view, state="Bihar", app=APP):
+    """{seconds, errors, heavy_modules} for one cold render of ``view`` in a new process."""
+    code = _PROBE.format(app=app, state=state, view=view, heavy=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(app), capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--view", default="Data", help="view to render (default: %(default)s)")
+    parser.add_argument("--state", default="Bihar")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help="seconds to first paint (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    result = probe(args.view, args.state)
+    print(f"{args.view or '(no view)'}: {result['seconds']:.2f}s to first paint (budget {args.budget:.2f}s)")
+    print(f"heavy modules imported: {', '.join(result['heavy_modules']) or 'none'}")
+
+    failed = bool(result["errors"])
+    for error in result["errors"]:
+        print(f"ERROR {error}")
+    if result["seconds"] > args.budget:
+        print(f"OVER BUDGET by {result['seconds'] - args.budget:.2f}s")
+        failed = True
+    if args.view in LIGHT_VIEWS and result["heavy_modules"]:
+        print(f"UNEXPECTED IMPORTS for the {args.view} view: {result['heavy_modules']}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
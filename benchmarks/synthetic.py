@@ -0,0 +1,72 @@
+"""Scale the dashboard CSVs up to an arbitrary row count with the same schemas.
+
+The real tables are replicated under new state names ("Bihar 1", "Bihar 2", ...)
+with log-normal noise on every numeric column except the year, so joins on
+(State, year), per-state filtering and per-year grouping behave like the real
+data at any size. Crop_data gets exactly ``rows`` rows; mgnrega,
+Area_affected and the WPI table grow by the same replication factor.
+"""
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+from dashboard import loader
+
+YEAR_COLUMNS = {"crop_data": "Crop_Year", "area_affected": "Year", "mgnrega": "year", "wpi": "Crop_Year"}
+
+
+def _replicate(frame, replicas, year_col, rng, n_rows=None):
+    n_rows = len(frame) * replicas if n_rows is None else n_rows
+    source = np.arange(n_rows) % len(frame)
+    replica = np.arange(n_rows) // len(frame)
+    out = frame.iloc[source].reset_index(drop=True)
+
+    # "Bihar" in replica 0, "Bihar 1", "Bihar 2", ... afterwards
+    states = frame["State"].astype("category").cat
+    names = [str(s) if r == 0 else f"{s} {r}" for r in range(replicas) for s in states.categories]
+    codes = states.codes.to_numpy()[source].astype(np.int64) + replica * len(states.categories)
+    out["State"] = pd.Categorical.from_codes(codes, categories=names)
+
+    for column in out.columns:
+        if column in ("State", "Crop", year_col) or not pd.api.types.is_numeric_dtype(out[column]):
+            continue
+        noise = np.where(replica == 0, 1.0, rng.lognormal(0.0, 0.1, n_rows))
+        values = out[column].to_numpy(dtype=np.float64) * noise
+        if pd.api.types.is_integer_dtype(out[column]):
+            values = np.round(values).astype(np.int64)
+        out[column] = values
+    return out
+
+
+def generate(rows, seed=0, data_dir=loader.DATA_DIR):
+    """Return {source name: DataFrame} with ``rows`` crop rows and matching MGNREGA/area tables."""
+    rng = np.random.default_rng(seed)
+    real = {name: pd.read_csv(os.path.join(data_dir, filename), encoding="utf-8-sig")
+            for name, filename in loader.SOURCES.items()}
+    replicas = max(1, math.ceil(rows / len(real["crop_data"])))
+    return {
+        name: _replicate(frame, replicas, YEAR_COLUMNS[name], rng, n_rows=rows if name == "crop_data" else None)
+        for name, frame in real.items()
+    }
+
+
+def write_dataset(frames, out_dir):
+    """Write the frames as CSVs named like the real sources, so dashboard.loader can read them."""
+    os.makedirs(out_dir, exist_ok=True)
+    for name, frame in frames.items():
+        table = pa.Table.from_pandas(frame.astype({c: str for c in ("State", "Crop") if c in frame}), preserve_index=False)
+        tmp_path = os.path.join(out_dir, loader.SOURCES[name] + ".tmp")
+        pa_csv.write_csv(table, tmp_path, pa_csv.WriteOptions(quoting_style="needed"))
+        os.replace(tmp_path, os.path.join(out_dir, loader.SOURCES[name]))
+
+
+def ensure_dataset(rows, seed, root):
+    """Directory holding the synthetic CSVs for ``rows``/``seed``, generating them if missing."""
+    out_dir = os.path.join(root, f"rows-{rows}-seed-{seed}")
+    if not all(os.path.exists(os.path.join(out_dir, filename)) for filename in loader.SOURCES.values()):
+        write_dataset(generate(rows, seed), out_dir)
+    return out_dir
@@ -0,0 +1 @@
+"""Data and analytics helpers used by the Streamlit dashboard (Streamlit.py)."""
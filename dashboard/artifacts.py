@@ -0,0 +1,223 @@
+"""Dataset labels, model settings and the derived results shown by the dashboard.
+
+Streamlit.py computes these on demand; precompute.py computes all of them ahead
+of time into a bundle. Keeping the definitions here means both produce the
+same numbers and the same figure-cache keys.
+"""
+import numpy as np
+
+from dashboard.correlation import CorrelationPanel, build_panel
+from dashboard.cropstore import CropStore
+from dashboard.distress import DistressPanel
+from dashboard.downsample import DEFAULT_POINTS, reduce_series
+from dashboard.lazy import lazy_import
+from dashboard.outliers import detect_outliers, detect_outliers_chunks
+from dashboard.panel import CROP_RECORD, UnifiedPanel
+from dashboard.partition import PartitionIndex
+from dashboard.stats import summarize, summarize_chunks
+from dashboard.whatif import predict_scenarios
+
+# scikit-learn and scipy.stats load on first use, so views that don't need them start faster
+importance = lazy_import("dashboard.importance")
+qq = lazy_import("dashboard.qq")
+scaling = lazy_import("dashboard.scaling")
+
+# Label shown in the app -> loader source name
+DATASETS = {
+    "Crop Data": "crop_data",
+    "Production Data": "mgnrega",
+    "Area Data": "area_affected",
+}
+
+# Columns identifying a row in the outlier table
+OUTLIER_ID_COLUMNS = {
+    "Crop Data": ["State", "Crop", "Crop_Year"],
+    "Production Data": ["State", "year"],
+    "Area Data": ["State", "Year"],
+}
+
+HARVEST_TARGET = 'Harvest_Price'
+HARVEST_YEAR = 'Crop_Year'
+
+MGNREGA_SCALE_COLUMNS = ['Rural_Population', 'No_of_Registered', 'Employment_demanded', 'Employment_offered', 'Employment_Availed']
+MGNREGA_FEATURES = ['Rural_Population', 'No_of_Registered', 'Employment_demanded', 'Employment_offered']
+MGNREGA_TARGET = 'Employment_Availed'
+MGNREGA_YEAR = 'year'
+
+# Metric cards compare the two most recent MGNREGA years
+METRIC_COLUMNS = ['No_of_Registered', 'Employment_demanded', 'Employment_offered', 'Employment_Availed']
+
+# Series plotted by the APY Trends / Harvest tabs (per crop) and the Mgnrega tab (scaled), against the
+# year column, with how rows sharing a year (districts, seasons) are combined before downsampling
+CROP_TRENDS = {'Area_(in_Ha)': 'sum', 'Production_(in_Tonnes)': 'sum', 'Yield_(kg/Ha)': 'mean',
+               'cost_of_prod': 'mean', 'Harvest_Price': 'mean', 'WPI': 'mean'}
+EMPLOYMENT_TRENDS = {'Employment_demanded': 'mean', 'Employment_offered': 'mean'}
+
+# Crop data held in a dashboard.cropstore.CropStore is never loaded whole: its statistics are
+# streamed, and the QQ plots and normality tests use a uniform sample of this many rows
+QQ_SAMPLE_ROWS = 200_000
+
+
+def dataset_frames(crop_data, area_affected, mgnrega):
+    return {"Crop Data": crop_data, "Production Data": mgnrega, "Area Data": area_affected}
+
+
+def crop_names(crop_data):
+    if isinstance(crop_data, CropStore):
+        return crop_data.crops()
+    return sorted(crop_data['Crop'].unique())
+
+
+def harvest_feature_columns(crop_data):
+    # Every numeric crop column except 'Crop_Year' and the 'Harvest_Price' target
+    if isinstance(crop_data, CropStore):
+        crop_data = crop_data.empty()
+    categorical_cols = crop_data.select_dtypes(include=['object', 'category']).columns
+    return [col for col in crop_data.columns if col not in categorical_cols and col != HARVEST_YEAR and col != HARVEST_TARGET]
+
+
+def scaled_views(mgnrega):
+    """Min-max scaled copies shown by the Mgnrega tab."""
+    return {
+        "mgnrega": scaling.ScaledView(mgnrega, MGNREGA_SCALE_COLUMNS),
+    }
+
+
+def unified_panel(crop_data, area_affected, mgnrega, wpi):
+    """The (State, Crop, year) panel of all four datasets that the per-state views and correlations read."""
+    return UnifiedPanel(crop_data, wpi, mgnrega, area_affected)
+
+
+def scaled_index(views):
+    """State index over the scaled MGNREGA frame used by the Mgnrega tab."""
+    return PartitionIndex(views["mgnrega"].frame, ["State"], order_by="year")
+
+
+# The forests train on the raw columns. Min-max scaling is a positive affine map per column, which
+# leaves tree splits and normalized importances unchanged, while the scaled values depend on every
+# year's min/max: training on them would change each year's cache key whenever a year is added.
+
+def _harvest_yearly(fit, crop_data, n_jobs):
+    features = harvest_feature_columns(crop_data)
+    if isinstance(crop_data, CropStore):
+        # One year's partitions in memory at a time
+        results = {}
+        for year in crop_data.years():
+            rows = crop_data.rows(year=year, columns=features + [HARVEST_TARGET, HARVEST_YEAR], order_by=())
+            results.update(fit(rows, features, HARVEST_TARGET, HARVEST_YEAR, n_jobs=n_jobs))
+        return results
+    return fit(crop_data, features, HARVEST_TARGET, HARVEST_YEAR, n_jobs=n_jobs)
+
+
+def harvest_importances(crop_data, n_jobs=-1):
+    """{Crop_Year: importances} of the per-year 'Harvest_Price' forests."""
+    return _harvest_yearly(importance.yearly_feature_importance, crop_data, n_jobs)
+
+
+def mgnrega_importances(mgnrega, n_jobs=-1):
+    """{year: importances} of the per-year 'Employment_Availed' forests."""
+    return importance.yearly_feature_importance(mgnrega, MGNREGA_FEATURES, MGNREGA_TARGET, MGNREGA_YEAR, n_jobs=n_jobs)
+
+
+def harvest_models(crop_data, n_jobs=-1):
+    """{Crop_Year: forest} behind harvest_importances, loaded from the model store."""
+    return _harvest_yearly(importance.yearly_models, crop_data, n_jobs)
+
+
+def mgnrega_models(mgnrega, n_jobs=-1):
+    """{year: forest} behind mgnrega_importances, loaded from the model store."""
+    return importance.yearly_models(mgnrega, MGNREGA_FEATURES, MGNREGA_TARGET, MGNREGA_YEAR, n_jobs=n_jobs)
+
+
+def harvest_what_if(crop_data, models, changes, year):
+    """'Harvest_Price' predictions for every (State, Crop) row of ``year`` under each scenario in ``changes``.
+
+    ``changes`` is a dashboard.whatif change table; ``models`` comes from harvest_models.
+    """
+    if isinstance(crop_data, CropStore):
+        base = crop_data.rows(year=year)
+    else:
+        base = crop_data[crop_data[HARVEST_YEAR] == year]
+    return predict_scenarios(models, base, harvest_feature_columns(crop_data), changes, HARVEST_YEAR, id_columns=("State", "Crop"))
+
+
+def mgnrega_what_if(mgnrega, models, changes, year):
+    """'Employment_Availed' predictions for every state of ``year`` under each scenario in ``changes``."""
+    return predict_scenarios(models, mgnrega[mgnrega[MGNREGA_YEAR] == year], MGNREGA_FEATURES, changes, MGNREGA_YEAR)
+
+
+def _latest_two(years):
+    years = sorted(int(year) for year in years)
+    return years[-1], (years[-2] if len(years) > 1 else None)
+
+
+def metric_years(mgnrega):
+    """(latest, previous) MGNREGA years in the data; previous is None with a single year."""
+    return _latest_two(mgnrega[MGNREGA_YEAR].unique())
+
+
+def largest_states(mgnrega, n):
+    """The ``n`` states with the largest rural population in the latest MGNREGA year."""
+    latest = mgnrega[mgnrega[MGNREGA_YEAR] == metric_years(mgnrega)[0]]
+    return latest.nlargest(n, "Rural_Population")["State"].tolist()
+
+
+def state_view(state, panel, scaled_mgnrega_index, budget=DEFAULT_POINTS):
+    """Metric cards and trend series for one state, as plain JSON-ready lists.
+
+    ``panel`` is the dashboard.panel.UnifiedPanel; ``scaled_mgnrega_index`` a
+    PartitionIndex over the scaled MGNREGA frame by State. Each trend is reduced
+    to at most ``budget`` points (see dashboard.downsample).
+    """
+    rows = panel.state_rows(state, "mgnrega")
+    years = rows[MGNREGA_YEAR].to_numpy()
+    latest_year, prev_year = _latest_two(panel.source_years("mgnrega"))
+
+    def year_row(year):
+        # The index keeps each state's rows ordered by year
+        pos = np.searchsorted(years, year) if year is not None else len(years)
+        if pos == len(years) or years[pos] != year:
+            return None
+        return {col: rows[col].iat[pos].item() for col in METRIC_COLUMNS}
+
+    # The state's crops are consecutive row ranges of the panel (for a CropStore, one read of its partitions)
+    return {
+        "metrics": {"latest_year": latest_year, "prev_year": prev_year,
+                    "latest": year_row(latest_year), "prev": year_row(prev_year)},
+        "crops": {crop: reduce_series(rows, HARVEST_YEAR, CROP_TRENDS, budget, distinct=CROP_RECORD)
+                  for crop, rows in panel.crop_groups(state, [HARVEST_YEAR] + list(CROP_TRENDS))},
+        "employment": reduce_series(scaled_mgnrega_index.rows(state), MGNREGA_YEAR, EMPLOYMENT_TRENDS, budget),
+    }
+
+
+def _summarize(data):
+    return summarize_chunks(data.chunks) if isinstance(data, CropStore) else summarize(data)
+
+
+def _outliers(data, id_columns):
+    if isinstance(data, CropStore):
+        # Streamed quartiles (interpolated from a fine histogram), then one pass for fences and rows
+        quartiles = {column: (stats["q1"], stats["median"], stats["q3"]) for column, stats in _summarize(data).items()}
+        return detect_outliers_chunks(data.chunks, quartiles, id_columns)
+    return detect_outliers(data, id_columns)
+
+
+def summaries(frames):
+    return {label: _summarize(frame) for label, frame in frames.items()}
+
+
+def outliers(frames):
+    return {label: _outliers(frame, OUTLIER_ID_COLUMNS[label]) for label, frame in frames.items()}
+
+
+def qq_data(frames):
+    return {label: qq.qq_points(frame.sample(QQ_SAMPLE_ROWS) if isinstance(frame, CropStore) else frame)
+            for label, frame in frames.items()}
+
+
+def correlations(panel):
+    return CorrelationPanel(build_panel(panel))
+
+
+def distress(crop_data, area_affected, mgnrega):
+    return DistressPanel(crop_data, mgnrega, area_affected)
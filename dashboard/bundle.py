@@ -0,0 +1,161 @@
+"""Versioned on-disk bundle of precomputed dashboard results.
+
+Layout of ``<root>/<data_version>/``::
+
+    manifest.json                 version, creation time, states and image index
+    summaries/<dataset>.json      dashboard.stats.summarize output
+    qq/<dataset>.json             dashboard.qq.qq_points output
+    outliers/<dataset>-stats.arrow, outliers/<dataset>-rows.arrow
+    correlation/panel.arrow, correlation/counts.arrow, correlation/<method>-{corr,p}.arrow
+    distress/panel.arrow, distress/correlations.arrow, distress/state-correlations.arrow
+    importance/<model>.json       per-year feature importances
+    states/<state>.json           metric cards and trend series per state and crop
+    images/<hash>.png             pre-rendered figures, keyed in the manifest
+
+The directory name is the data version from dashboard.loader, so a bundle is
+ignored as soon as any source CSV changes. Bundles written in an older layout
+(a different ``FORMAT``) are ignored too.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+
+import numpy as np
+import pyarrow.feather as feather
+
+from dashboard.artifacts import DATASETS
+from dashboard.correlation import CorrelationPanel
+from dashboard.distress import DistressPanel
+from dashboard.loader import DATA_DIR
+
+DEFAULT_BUNDLE_DIR = os.environ.get("DASHBOARD_BUNDLE_DIR", os.path.join(DATA_DIR, "bundle"))
+# Bumped whenever the contents change shape or meaning (2: downsampled trend series with envelopes,
+# 3: repeated crop records summed once, 4: also in the distress panel)
+FORMAT = 4
+
+
+def slug(name):
+    return re.sub(r"[^a-z0-9]+", "-", str(name).lower()).strip("-")
+
+
+def _to_json(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def write_json(path, obj):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as fh:
+        json.dump(obj, fh, default=_to_json)
+
+
+def read_json(path):
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def write_frame(path, frame):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    feather.write_feather(frame, path, compression="uncompressed")
+
+
+def read_frame(path):
+    return feather.read_table(path, memory_map=True).to_pandas()
+
+
+def image_file(key):
+    """Bundle-relative PNG path for a figure key (without the data version)."""
+    digest = hashlib.sha1(json.dumps(list(key), default=_to_json).encode()).hexdigest()[:20]
+    return os.path.join("images", f"{digest}.png")
+
+
+class BundleWriter:
+    """Write a bundle into a temporary directory and move it into place on ``finish``."""
+
+    def __init__(self, root, version):
+        self.root = root
+        self.version = version
+        self.path = os.path.join(root, f".{version}.tmp-{os.getpid()}")
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.makedirs(self.path)
+
+    def finish(self, manifest):
+        manifest = dict(manifest, version=self.version, format=FORMAT, created=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        write_json(os.path.join(self.path, "manifest.json"), manifest)
+        final_path = os.path.join(self.root, self.version)
+        shutil.rmtree(final_path, ignore_errors=True)
+        os.replace(self.path, final_path)
+        return final_path
+
+
+def _arrays(entry):
+    return {k: np.asarray(v) if isinstance(v, list) else v for k, v in entry.items()}
+
+
+def _matrix(frame):
+    return frame.set_index("column").rename_axis(None)
+
+
+class Bundle:
+    """Read access to a finished bundle directory."""
+
+    def __init__(self, path):
+        self.path = path
+        self.manifest = read_json(os.path.join(path, "manifest.json"))
+
+    @classmethod
+    def open(cls, root, version):
+        """The bundle for ``version`` under ``root``, or None if it has not been built (in this format)."""
+        path = os.path.join(root, version)
+        if not os.path.exists(os.path.join(path, "manifest.json")):
+            return None
+        bundle = cls(path)
+        return bundle if bundle.manifest.get("format") == FORMAT else None
+
+    def _file(self, *parts):
+        return os.path.join(self.path, *parts)
+
+    def summaries(self):
+        return {label: {column: _arrays(entry) for column, entry in read_json(self._file("summaries", f"{name}.json")).items()}
+                for label, name in DATASETS.items()}
+
+    def qq_data(self):
+        return {label: {column: _arrays(entry) for column, entry in read_json(self._file("qq", f"{name}.json")).items()}
+                for label, name in DATASETS.items()}
+
+    def outliers(self):
+        return {label: (read_frame(self._file("outliers", f"{name}-stats.arrow")).set_index("column"),
+                        read_frame(self._file("outliers", f"{name}-rows.arrow")))
+                for label, name in DATASETS.items()}
+
+    def correlations(self):
+        matrices = {method: (_matrix(read_frame(self._file("correlation", f"{method}-corr.arrow"))),
+                             _matrix(read_frame(self._file("correlation", f"{method}-p.arrow"))))
+                    for method in ("pearson", "spearman")}
+        counts = _matrix(read_frame(self._file("correlation", "counts.arrow")))
+        return CorrelationPanel.from_matrices(read_frame(self._file("correlation", "panel.arrow")), matrices, counts)
+
+    def distress(self):
+        return DistressPanel.from_frames(read_frame(self._file("distress", "panel.arrow")),
+                                         read_frame(self._file("distress", "correlations.arrow")),
+                                         read_frame(self._file("distress", "state-correlations.arrow")).set_index("State"))
+
+    def importances(self, model):
+        """{year: importances} for ``model`` ("harvest" or "mgnrega")."""
+        saved = read_json(self._file("importance", f"{model}.json"))
+        return {int(year): np.asarray(values) for year, values in saved["years"].items()}
+
+    def state(self, state):
+        return read_json(self._file("states", f"{slug(state)}.json"))
+
+    def images(self):
+        """(key, png bytes) for every pre-rendered figure; keys exclude the data version."""
+        for entry in self.manifest.get("images", []):
+            with open(self._file(entry["file"]), "rb") as fh:
+                yield tuple(entry["key"]), fh.read()
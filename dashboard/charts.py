@@ -0,0 +1,75 @@
+"""Matplotlib figures shown by the dashboard, built from precomputed arrays.
+
+Shared by Streamlit.py and the offline precompute script so both render the
+same images. Each function returns a Figure; callers are responsible for
+closing it (FigureCache.render does). Importing this module loads matplotlib
+(with the non-interactive Agg backend) and seaborn.
+"""
+import matplotlib
+import numpy as np
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import seaborn as sns  # noqa: E402
+
+PIE_COLORS = ['#eb5f1a', '#f6a417', '#66c6de', '#fecf16']
+
+
+def histogram_figure(stats):
+    fig, ax = plt.subplots(figsize=(8, 4))
+
+    # Plot the precomputed histogram and its KDE
+    edges = stats['hist_edges']
+    ax.bar(edges[:-1], stats['hist_counts'], width=np.diff(edges), align='edge', color='skyblue', edgecolor='black', alpha=0.7)
+    ax.plot(stats['grid'], stats['kde'], color='skyblue', linewidth=2)
+
+    # Plot Gaussian curve (Mean and Std Dev)
+    ax.plot(stats['grid'], stats['gaussian'], color='red', linestyle='-', label=f"Gaussian Curve (Mean: {stats['mean']:.2f}, Std Dev: {stats['std']:.2f})", linewidth=2)
+
+    # Plot Median as a vertical line
+    ax.axvline(stats['median'], color='green', linestyle='-', linewidth=2, label=f"Median: {stats['median']:.2f}")
+
+    ax.legend()
+    return fig
+
+
+def qq_figure(qq):
+    # Precomputed quantiles against the standardized reference line
+    fig, ax = plt.subplots(figsize=(6, 3))
+    ax.plot(qq['theoretical'], qq['sample'], 'o', color='#1f77b4', markersize=4)
+    ax.plot(qq['theoretical'], qq['intercept'] + qq['slope'] * qq['theoretical'], color='red')
+    ax.set_xlabel('Theoretical Quantiles')
+    ax.set_ylabel('Sample Quantiles')
+    return fig
+
+
+def correlation_figure(corr_matrix, method):
+    fig, ax = plt.subplots(figsize=(10, 8))
+    sns.heatmap(corr_matrix, annot=True, cmap='viridis', vmin=-1, vmax=1, ax=ax, fmt='.2f', cbar=True)
+    ax.set_title(f"Correlation Matrix ({method.capitalize()})", pad=20)
+    return fig
+
+
+def importance_bar_figure(importances_by_year, feature_names):
+    # Plot feature importance for each year
+    fig, ax = plt.subplots(figsize=(14, 8))
+    for year in sorted(importances_by_year):
+        ax.bar([f"{feature}\n{year}" for feature in feature_names], importances_by_year[year], alpha=0.7, label=f"Year {year}")
+
+    ax.set_xlabel('Features and Year', fontsize=14)
+    ax.set_ylabel('Feature Importance', fontsize=14)
+    ax.tick_params(axis='x', labelrotation=90, labelsize=10)
+    ax.tick_params(axis='y', labelsize=12)
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+    ax.legend(title='Year')
+    return fig
+
+
+def importance_pie_figure(importances, feature_names):
+    # Trim the palette if there are fewer features than colors
+    color_palette = PIE_COLORS[:len(feature_names)]
+
+    fig, ax = plt.subplots(figsize=(8, 8))
+    ax.pie(importances, labels=feature_names, autopct='%1.1f%%', startangle=90, colors=color_palette)
+    ax.axis('equal')
+    return fig
@@ -0,0 +1,114 @@
+"""State/year panel joining the datasets, with precomputed correlation matrices.
+
+The crop data is aggregated to one row per (State, year) next to the MGNREGA,
+Area_affected and mean WPI columns the unified panel already joined on that
+key. Each column is ranked once (only a pair with rows the other column lacks
+is re-ranked over their common rows), and the full Pearson and Spearman
+matrices (pairwise-complete) plus their p-values are computed with a handful of
+matrix products, so any subset the user selects is a submatrix lookup.
+"""
+import numpy as np
+import pandas as pd
+
+from dashboard.panel import CROP_RECORD
+
+KEY_COLUMNS = ["State", "year"]
+
+# How each crop column is rolled up to one value per State and year
+CROP_AGGREGATES = {
+    "Area_(in_Ha)": "sum",
+    "Production_(in_Tonnes)": "sum",
+    "Yield_(kg/Ha)": "mean",
+    "MSP": "mean",
+    "Annual_rainfall": "mean",
+    "cost_of_prod": "mean",
+    "Harvest_Price": "mean",
+}
+
+
+def build_panel(unified):
+    """One row per (State, year) present in the MGNREGA, crop and Area_affected data, from a UnifiedPanel.
+
+    With a CropStore behind the panel the crop sums are streamed, so only the partial sums per (State, year) are held in memory.
+    Repeated crop records (see dashboard.panel.CROP_RECORD) count once in the Area and Production sums.
+    """
+    return unified.state_year_frame(CROP_AGGREGATES, distinct=CROP_RECORD)
+
+
+def pairwise_pearson(values):
+    """Pearson r and pair counts for every column pair, using rows where both are present."""
+    mask = ~np.isnan(values)
+    x = np.where(mask, values, 0.0)
+    m = mask.astype(np.float64)
+    n = m.T @ m
+    sx = x.T @ m            # sum of column i over rows where j is present
+    sxx = (x * x).T @ m
+    sxy = x.T @ x
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = n * sxy - sx * sx.T
+        var = (n * sxx - sx * sx) * (n * sxx - sx * sx).T
+        r = cov / np.sqrt(var)
+    r = np.clip(r, -1.0, 1.0)
+    np.fill_diagonal(r, np.where(np.diag(n) > 1, 1.0, np.nan))
+    return r, n
+
+
+def pairwise_spearman(values):
+    """Spearman r and pair counts for every column pair, ranking each pair over the rows where both are present."""
+    r, n = pairwise_pearson(pd.DataFrame(values).rank(method="average").to_numpy(dtype=np.float64, na_value=np.nan))
+    present = ~np.isnan(values)
+    for i, j in zip(*np.triu_indices(values.shape[1], k=1)):
+        both = present[:, i] & present[:, j]
+        # Whole-column ranks are the pair's ranks unless one column has rows the other lacks
+        if (both == present[:, i]).all() and (both == present[:, j]).all():
+            continue
+        pair, _ = pairwise_pearson(pd.DataFrame(values[both][:, [i, j]]).rank(method="average").to_numpy())
+        r[i, j] = r[j, i] = pair[0, 1]
+    return r, n
+
+
+def p_values(r, n):
+    """Two-sided p-values for correlations r over n observations (t-distribution, n - 2 dof)."""
+    from scipy import stats  # deferred: scipy.stats takes about a second to import
+
+    dof = n - 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = r * np.sqrt(dof / np.maximum(1.0 - r * r, 1e-300))
+        p = 2 * stats.t.sf(np.abs(t), np.where(dof > 0, dof, np.nan))
+    np.fill_diagonal(p, 0.0)
+    return p
+
+
+class CorrelationPanel:
+    """Correlation and p-value matrices over the numeric (non-key) panel columns."""
+
+    def __init__(self, panel):
+        self.panel = panel
+        self.columns = [c for c in panel.select_dtypes(include=["number"]).columns if c not in KEY_COLUMNS]
+        values = panel[self.columns].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        # {method: (correlations, p-values)} over all columns
+        self.matrices = {}
+        for method, pairwise in (("pearson", pairwise_pearson), ("spearman", pairwise_spearman)):
+            r, n = pairwise(values)
+            self.matrices[method] = (
+                pd.DataFrame(r, index=self.columns, columns=self.columns),
+                pd.DataFrame(p_values(r, n), index=self.columns, columns=self.columns),
+            )
+        self.counts = pd.DataFrame(n, index=self.columns, columns=self.columns)
+
+    @classmethod
+    def from_matrices(cls, panel, matrices, counts):
+        """Rebuild from previously computed ``matrices`` and ``counts`` without touching the data."""
+        self = cls.__new__(cls)
+        self.panel = panel
+        self.columns = list(counts.columns)
+        self.matrices = matrices
+        self.counts = counts
+        return self
+
+    def corr(self, columns, method="spearman"):
+        return self.matrices[method][0].loc[columns, columns]
+
+    def p_values(self, columns, method="spearman"):
+        return self.matrices[method][1].loc[columns, columns]
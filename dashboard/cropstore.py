@@ -0,0 +1,338 @@
+"""Out-of-core crop data: a Parquet dataset partitioned by State and Crop_Year.
+
+For crop data too large to hold in every worker (district- or season-level
+rows), the CSV is streamed once into ``State=<state>/Crop_Year=<year>/``
+Parquet files. ``CropStore`` then reads only what a view needs: the filters on
+State, Crop and Crop_Year prune whole partitions before any file is opened,
+only the requested columns are decoded, and the all-states statistics are
+aggregated batch by batch, so memory grows with the size of the result rather
+than with the dataset.
+
+The app uses a store instead of the in-memory Crop_data frame when the
+``DASHBOARD_CROP_STORE`` environment variable is set: to ``1`` to build one
+from Crop_data.csv under the cache directory, or to the directory of a store
+built offline with
+
+    python -m dashboard.cropstore crop_district_season.csv /data/cropstore
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+
+from dashboard import loader
+
+CROP_STORE = os.environ.get("DASHBOARD_CROP_STORE")
+
+PARTITIONING = ds.partitioning(pa.schema([("State", pa.string()), ("Crop_Year", pa.int16())]), flavor="hive")
+MANIFEST = "manifest.json"
+# Position of each row in the source file, so reads can come back in source order
+ROW_COLUMN = "_row"
+
+# Rows per streamed batch; bounds the memory of every scan
+BATCH_ROWS = 64 * 1024
+# Merge per-batch partial aggregates once this many have piled up
+MERGE_EVERY = 32
+
+
+def _csv_schema(path):
+    """Column types for the whole file: numbers as float64 (a later block may have decimals), Crop_Year as int16."""
+    reader = pacsv.open_csv(path)
+    fields = []
+    for field in reader.schema:
+        name = field.name.replace("\ufeff", "").strip()
+        if name == "Crop_Year":
+            fields.append(pa.field(name, pa.int16()))
+        elif pa.types.is_integer(field.type) or pa.types.is_floating(field.type):
+            fields.append(pa.field(name, pa.float64()))
+        else:
+            fields.append(pa.field(name, pa.string()))
+    raw_names = reader.schema.names
+    reader.close()
+    return raw_names, pa.schema(fields)
+
+
+def _compact_dtype(column):
+    """The dtype ``loader.compact_frame`` would give this numeric column if pandas had parsed it."""
+    values = column.to_numpy(zero_copy_only=False)
+    if values.dtype.kind == "f" and len(values) and not np.isnan(values).any() and (values == np.round(values)).all():
+        values = values.astype(np.int64)  # pandas parses a column of whole numbers as integers
+    return pd.to_numeric(pd.Series(values), downcast="integer" if values.dtype.kind in "iu" else "float").dtype
+
+
+def build(source, root, block_size=16 << 20):
+    """Stream the crop CSV ``source`` into a partitioned store at ``root`` and return it.
+
+    The CSV is read one block at a time, so building needs no more memory than
+    reading does. The store is written next to ``root`` and renamed into place.
+    """
+    raw_names, schema = _csv_schema(source)
+    options = pacsv.ConvertOptions(column_types=dict(zip(raw_names, schema.types)))
+    reader = pacsv.open_csv(source, read_options=pacsv.ReadOptions(block_size=block_size), convert_options=options)
+
+    seen = {"rows": 0, "states": set(), "years": set(), "crops": set()}
+    # Whole-file compact dtype per numeric column, so every read is cast the same way
+    dtypes = {}
+
+    stored = schema.append(pa.field(ROW_COLUMN, pa.int64()))
+
+    def batches():
+        for batch in reader:
+            positions = pa.array(np.arange(seen["rows"], seen["rows"] + batch.num_rows, dtype=np.int64))
+            batch = pa.RecordBatch.from_arrays(batch.columns + [positions], schema=stored)
+            seen["rows"] += batch.num_rows
+            seen["states"].update(batch.column("State").unique().to_pylist())
+            seen["years"].update(batch.column("Crop_Year").unique().to_pylist())
+            if "Crop" in schema.names:
+                seen["crops"].update(batch.column("Crop").unique().to_pylist())
+            for field in schema:
+                if not pa.types.is_string(field.type):
+                    dtype = _compact_dtype(batch.column(field.name))
+                    dtypes[field.name] = np.result_type(dtypes[field.name], dtype) if field.name in dtypes else dtype
+            yield batch
+
+    tmp_root = f"{root.rstrip(os.sep)}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_root, ignore_errors=True)
+    ds.write_dataset(batches(), tmp_root, schema=stored, format="parquet", partitioning=PARTITIONING,
+                     preserve_order=True, max_partitions=1 << 16)
+    manifest = {
+        "source": os.path.basename(source),
+        "version": loader.file_fingerprint(source)["sha1"][:16],
+        "columns": schema.names,
+        "dtypes": {name: np.dtype(dtype).name for name, dtype in dtypes.items()},
+        "rows": seen["rows"],
+        "states": sorted(state for state in seen["states"] if state is not None),
+        "years": sorted(year for year in seen["years"] if year is not None),
+        "crops": sorted(crop for crop in seen["crops"] if crop is not None),
+    }
+    with open(os.path.join(tmp_root, MANIFEST), "w") as fh:
+        json.dump(manifest, fh, indent=2)
+    shutil.rmtree(root, ignore_errors=True)
+    os.replace(tmp_root, root)
+    return CropStore(root)
+
+
+def _combine(partials, keys):
+    return pd.concat(partials).groupby(level=keys, sort=True).sum()
+
+
+class CropStore:
+    """Read access to a partitioned crop store with partition pruning and column projection.
+
+    Frames come back in the same compact form, dtypes and column order as
+    ``loader.load_table`` gives the whole CSV, so views built on either match.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        with open(os.path.join(root, MANIFEST)) as fh:
+            self.manifest = json.load(fh)
+        self.version = self.manifest["version"]
+        self.columns = self.manifest["columns"]
+        self.dtypes = self.manifest["dtypes"]
+        self.dataset = ds.dataset(root, format="parquet", partitioning=PARTITIONING,
+                                  ignore_prefixes=[".", "_", MANIFEST])
+
+    def __len__(self):
+        return self.manifest["rows"]
+
+    def states(self):
+        return list(self.manifest["states"])
+
+    def years(self):
+        return list(self.manifest["years"])
+
+    def crops(self):
+        return list(self.manifest["crops"])
+
+    @staticmethod
+    def where(state=None, crop=None, year=None):
+        """Filter expression for the given State / Crop / Crop_Year (any of them may be None)."""
+        conditions = [ds.field(column) == value for column, value in
+                      (("State", state), ("Crop", crop), ("Crop_Year", year)) if value is not None]
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return expression
+
+    def _compact(self, frame):
+        """Categorical State/Crop and the whole-file numeric dtypes, as in ``loader.load_table``."""
+        for column in frame.columns:
+            if column in loader.CATEGORICAL_COLUMNS:
+                frame[column] = frame[column].astype("category")
+            elif column in self.dtypes:
+                frame[column] = frame[column].astype(self.dtypes[column])
+        return frame
+
+    def empty(self):
+        """A zero-row frame with the store's columns and dtypes."""
+        return self._compact(self.dataset.schema.empty_table().to_pandas()[self.columns])
+
+    def scanner(self, columns=None, filter=None):
+        return self.dataset.scanner(columns=columns, filter=filter, batch_size=BATCH_ROWS)
+
+    def rows(self, state=None, crop=None, year=None, columns=None, order_by=("State", "Crop", "Crop_Year")):
+        """The matching rows, reading only their partitions.
+
+        Rows are ordered by the ``order_by`` columns, ties (and ``order_by=()``)
+        in the order of the source file, so ``rows(year=y, order_by=())`` equals
+        the in-memory frame's rows for that year.
+        """
+        columns = [c for c in self.columns if columns is None or c in columns]
+        table = self.scanner(columns + [ROW_COLUMN], self.where(state, crop, year)).to_table()
+        order = [(c, "ascending") for c in order_by if c in columns] + [(ROW_COLUMN, "ascending")]
+        return self._compact(table.sort_by(order).drop_columns([ROW_COLUMN]).to_pandas())
+
+    def chunks(self, columns=None, filter=None):
+        """Yield the matching rows as DataFrames of at most BATCH_ROWS rows."""
+        columns = [c for c in self.columns if columns is None or c in columns]
+        for batch in self.scanner(columns, filter).to_batches():
+            if batch.num_rows:
+                yield batch.to_pandas()
+
+    def aggregate(self, keys, aggregates, filter=None, expressions=None, distinct=None):
+        """``groupby(keys).agg(aggregates)`` computed batch by batch.
+
+        ``aggregates`` maps a column to "sum" or "mean"; ``expressions`` may
+        define extra columns as Arrow expressions over the stored ones (computed
+        during the scan). Only the partial sums and counts per group are kept.
+        ``distinct`` names columns that, with ``keys``, identify a record: rows
+        repeating a record are counted once by the sums. ``keys`` must then
+        include State and Crop_Year, so repeats share a partition, and the scan
+        reads whole partitions (see ``partitions``) instead of batches.
+        """
+        expressions = expressions or {}
+        columns = {key: ds.field(key) for key in keys}
+        columns.update({column: expressions.get(column, ds.field(column)) for column in aggregates})
+        values = list(aggregates)
+        if distinct:
+            columns.update({column: ds.field(column) for column in distinct})
+            sums = [column for column, how in aggregates.items() if how == "sum"]
+
+        partials = []
+        for batch in self.partitions(columns, filter) if distinct else self.scanner(columns, filter).to_batches():
+            if not batch.num_rows:
+                continue
+            frame = batch.to_pandas()
+            grouped = frame.groupby(keys, sort=False)[values]
+            partial = pd.concat({"sum": grouped.sum(), "count": grouped.count()}, axis=1)
+            if distinct:
+                records = frame.drop_duplicates(list(keys) + list(distinct)).groupby(keys, sort=False)[sums].sum()
+                for column in sums:
+                    partial[("sum", column)] = records[column]
+            partials.append(partial)
+            if len(partials) >= MERGE_EVERY:
+                partials = [_combine(partials, keys)]
+        if not partials:
+            return pd.DataFrame(columns=values, index=pd.MultiIndex.from_tuples([], names=keys), dtype=np.float64)
+
+        totals = _combine(partials, keys)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result = pd.DataFrame({
+                column: totals["sum"][column] if how == "sum"
+                else totals["sum"][column] / totals["count"][column].where(totals["count"][column] > 0)
+                for column, how in aggregates.items()
+            })
+        return result
+
+    def partitions(self, columns=None, filter=None):
+        """Yield the matching rows as Arrow tables of whole (State, Crop_Year) partitions.
+
+        Small partitions are gathered up to BATCH_ROWS rows per table; a larger
+        partition comes as one table of its own size.
+        """
+        fragments = {}
+        for fragment in self.dataset.get_fragments(filter=filter):
+            fragments.setdefault(str(fragment.partition_expression), []).append(fragment)
+        pending, rows = [], 0
+        for group in fragments.values():
+            for fragment in group:
+                pending.append(ds.Scanner.from_fragment(fragment, schema=self.dataset.schema, columns=columns,
+                                                        filter=filter).to_table())
+                rows += pending[-1].num_rows
+            if rows >= BATCH_ROWS:
+                yield pa.concat_tables(pending)
+                pending, rows = [], 0
+        if pending:
+            yield pa.concat_tables(pending)
+
+    def sample(self, n, columns=None, seed=0):
+        """About ``n`` rows drawn uniformly (each row kept with probability n / rows) in one scan."""
+        rng = np.random.default_rng(seed)
+        fraction = min(1.0, n / max(len(self), 1))
+        picked = [chunk[rng.random(len(chunk)) < fraction] for chunk in self.chunks(columns)]
+        return self._compact(pd.concat(picked, ignore_index=True)) if picked else self.empty()
+
+
+# Stores already opened in this process, by (directory, manifest mtime)
+_opened = {}
+
+
+def _open_cached(root):
+    key = (root, os.stat(os.path.join(root, MANIFEST)).st_mtime_ns)
+    if key not in _opened:
+        _opened[key] = CropStore(root)
+    return _opened[key]
+
+
+def open_store(setting=CROP_STORE, data_dir=loader.DATA_DIR, cache_dir=loader.CACHE_DIR):
+    """The store named by ``setting``: a store directory, or "1" for one built from Crop_data.csv.
+
+    A store built from the CSV lives under ``cache_dir/cropstore/<sha1>/`` and is
+    rebuilt whenever the CSV changes.
+    """
+    if os.path.isfile(os.path.join(setting, MANIFEST)):
+        return _open_cached(setting)
+
+    store_dir = os.path.join(cache_dir, "cropstore")
+    os.makedirs(store_dir, exist_ok=True)
+    source = os.path.join(data_dir, loader.SOURCES["crop_data"])
+    pointer = os.path.join(store_dir, "source.json")
+    fingerprint = loader.file_fingerprint(source, loader._read_manifest(pointer))
+    root = os.path.join(store_dir, fingerprint["sha1"][:16])
+    if not os.path.isfile(os.path.join(root, MANIFEST)):
+        build(source, root)
+        for entry in os.listdir(store_dir):
+            if entry not in (fingerprint["sha1"][:16], "source.json"):
+                shutil.rmtree(os.path.join(store_dir, entry), ignore_errors=True)
+    loader._write_manifest(pointer, fingerprint)
+    return _open_cached(root)
+
+
+def load_all(data_dir=loader.DATA_DIR, cache_dir=loader.CACHE_DIR):
+    """Like ``loader.load_all``, but with a CropStore for crop_data when ``DASHBOARD_CROP_STORE`` is set."""
+    if not CROP_STORE:
+        return loader.load_all(data_dir, cache_dir)
+    return (open_store(CROP_STORE, data_dir, cache_dir),
+            loader.load_table("area_affected", data_dir, cache_dir), loader.load_table("mgnrega", data_dir, cache_dir))
+
+
+def data_version(data_dir=loader.DATA_DIR, cache_dir=loader.CACHE_DIR):
+    """``loader.data_version``, extended with the store's version when one is in use."""
+    version = loader.data_version(data_dir, cache_dir)
+    if not CROP_STORE:
+        return version
+    store = open_store(CROP_STORE, data_dir, cache_dir)
+    return hashlib.sha1(f"{version};cropstore:{store.version}".encode()).hexdigest()[:16]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a crop CSV into a State/Crop_Year partitioned store.")
+    parser.add_argument("source", help="CSV with the Crop_data.csv columns")
+    parser.add_argument("out", help="store directory (replaced if it exists)")
+    args = parser.parse_args(argv)
+    store = build(args.source, args.out)
+    print(f"Wrote {len(store):,} rows for {len(store.states())} states and {len(store.years())} years to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
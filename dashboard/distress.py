@@ -0,0 +1,205 @@
+"""All-states panel relating crop distress to MGNREGA work demand.
+
+One row per (State, year) holding the year-on-year change in
+Employment_demanded next to the distress indicators of the same state and
+year: the area-weighted change in crop yields, the share of crop area whose
+yield fell, the share of the state's crop area affected, and the rainfall
+anomaly. Everything is built with grouped, vectorized operations over all
+states at once, along with lagged correlations between demand and each
+indicator, nationally and per state.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+
+from dashboard.correlation import p_values, pairwise_pearson
+from dashboard.cropstore import CropStore
+from dashboard.panel import CROP_RECORD
+
+KEY_COLUMNS = ["State", "year"]
+
+# Area_aff is reported in lakh hectares (Bihar's 7.41 in 2021 is ~11% of its 6.9M ha crop area)
+AREA_AFF_UNIT_HA = 100_000
+
+# Indicator column -> label
+INDICATORS = {
+    "yield_drop_share": "Crop area with falling yield",
+    "area_aff_share": "Crop area affected",
+    "yield_change": "Yield change (area-weighted)",
+    "rainfall_anomaly": "Rainfall anomaly",
+}
+# Sign that turns each indicator into "higher = more distress" for the composite score
+DISTRESS_SIGN = {"yield_drop_share": 1, "area_aff_share": 1, "yield_change": -1, "rainfall_anomaly": -1}
+LAGS = (0, 1)
+
+
+def _previous_year(frame, keys, columns, year="year"):
+    """``columns`` from the row one year earlier within each ``keys`` group (NaN if that year is missing).
+
+    ``frame`` must be sorted by keys then year.
+    """
+    grouped = frame.groupby(keys, observed=True, sort=False)
+    previous = grouped[columns].shift(1)
+    gap = frame[year] - grouped[year].shift(1)
+    return previous.where(gap == 1)
+
+
+def _relative_change(current, previous):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = current / previous - 1
+    return change.where(previous > 0)
+
+
+def _crop_sums(crop_data):
+    """Crop area and yield x area summed per (State, Crop, year) over rows with a positive area and yield.
+
+    Repeated crop records (see dashboard.panel.CROP_RECORD) count once.
+    """
+    keys = ["State", "Crop", "year"]
+    if isinstance(crop_data, CropStore):
+        area, crop_yield = ds.field("Area_(in_Ha)"), ds.field("Yield_(kg/Ha)")
+        sums = crop_data.aggregate(["State", "Crop", "Crop_Year"], {"Area_(in_Ha)": "sum", "weighted_yield": "sum"},
+                                   filter=(area > 0) & (crop_yield > 0), expressions={"weighted_yield": crop_yield * area},
+                                   distinct=CROP_RECORD)
+        return sums.reset_index().rename(columns={"Crop_Year": "year"})
+    crop = crop_data.drop_duplicates(["State", "Crop", "Crop_Year"] + CROP_RECORD).rename(columns={"Crop_Year": "year"})
+    crop = crop[(crop["Area_(in_Ha)"] > 0) & (crop["Yield_(kg/Ha)"] > 0)]
+    crop = crop.assign(State=crop["State"].astype(str), Crop=crop["Crop"].astype(str),
+                       weighted_yield=crop["Yield_(kg/Ha)"] * crop["Area_(in_Ha)"])
+    return crop.groupby(keys)[["Area_(in_Ha)", "weighted_yield"]].sum().reset_index()
+
+
+def _state_rainfall(crop_data):
+    """Mean Annual_rainfall per (State, year); it is a state-level figure repeated on every crop row."""
+    if isinstance(crop_data, CropStore):
+        rain = crop_data.aggregate(["State", "Crop_Year"], {"Annual_rainfall": "mean"})["Annual_rainfall"]
+        return rain.rename_axis(KEY_COLUMNS).astype(np.float64)
+    rain = crop_data.assign(State=crop_data["State"].astype(str)).rename(columns={"Crop_Year": "year"})
+    return rain.groupby(KEY_COLUMNS)["Annual_rainfall"].mean().astype(np.float64)
+
+
+def crop_yield_changes(crop_data):
+    """Yield and its year-on-year change per (State, Crop, year); duplicate rows are area-weighted."""
+    keys = ["State", "Crop", "year"]
+    sums = _crop_sums(crop_data)
+    out = sums[keys].assign(area=sums["Area_(in_Ha)"], **{"yield": sums["weighted_yield"] / sums["Area_(in_Ha)"]})
+    out["yield_change"] = _relative_change(out["yield"], _previous_year(out, ["State", "Crop"], "yield"))
+    return out
+
+
+def _crop_indicators(crop_data, crop_changes):
+    """Yield change, falling-yield area share, worst crop and rainfall per (State, year)."""
+    changes = crop_changes.dropna(subset=["yield_change"])
+    changes = changes.assign(weighted_change=changes["yield_change"] * changes["area"],
+                             falling_area=changes["area"].where(changes["yield_change"] < 0, 0.0))
+    sums = changes.groupby(KEY_COLUMNS)[["area", "weighted_change", "falling_area"]].sum()
+    indicators = pd.DataFrame({
+        "yield_change": sums["weighted_change"] / sums["area"],
+        "yield_drop_share": sums["falling_area"] / sums["area"],
+    })
+    worst = changes.sort_values("yield_change", kind="stable").groupby(KEY_COLUMNS).first()
+    indicators["worst_crop"] = worst["Crop"]
+    indicators["worst_crop_change"] = worst["yield_change"]
+
+    rain = _state_rainfall(crop_data)
+    anomaly = rain / rain.groupby(level="State").transform("mean") - 1
+    return indicators.join(pd.DataFrame({"rainfall": rain, "rainfall_anomaly": anomaly}), how="outer")
+
+
+def build_panel(crop_data, mgnrega, area_affected):
+    """One row per MGNREGA (State, year) with demand, its YoY change and the distress indicators."""
+    demand = mgnrega[["State", "year", "Employment_demanded"]].assign(State=mgnrega["State"].astype(str))
+    demand = demand.sort_values(KEY_COLUMNS, kind="stable").reset_index(drop=True)
+    demand["Employment_demanded"] = demand["Employment_demanded"].astype(np.float64)
+    demand["demand_yoy"] = _relative_change(demand["Employment_demanded"],
+                                            _previous_year(demand, ["State"], "Employment_demanded"))
+
+    area = area_affected.assign(State=area_affected["State"].astype(str)).rename(columns={"Year": "year"})
+    area = area.set_index(KEY_COLUMNS)
+    area_share = (area["Area_aff"].astype(np.float64) * AREA_AFF_UNIT_HA / area["Total Area of State"]).rename("area_aff_share")
+
+    crop = _crop_indicators(crop_data, crop_yield_changes(crop_data))
+    return demand.join(crop, on=KEY_COLUMNS).join(area_share, on=KEY_COLUMNS)
+
+
+def _lagged(panel, column, lag):
+    """``column`` from ``lag`` years earlier in the same state (NaN where that year is missing)."""
+    if lag == 0:
+        return panel[column]
+    values = panel.groupby("State", sort=False)[column].shift(lag)
+    gap = panel["year"] - panel.groupby("State", sort=False)["year"].shift(lag)
+    return values.where(gap == lag)
+
+
+def lagged_correlations(panel, lags=LAGS):
+    """Pooled Pearson r, n and p between demand_yoy and each indicator ``lag`` years earlier."""
+    columns = [(indicator, lag) for indicator in INDICATORS for lag in lags]
+    values = np.column_stack([panel["demand_yoy"].to_numpy(np.float64)]
+                             + [_lagged(panel, indicator, lag).to_numpy(np.float64) for indicator, lag in columns])
+    r, n = pairwise_pearson(values)
+    p = p_values(r, n)
+    return pd.DataFrame({
+        "indicator": [INDICATORS[indicator] for indicator, _ in columns],
+        "lag": [lag for _, lag in columns],
+        "r": r[0, 1:], "n": n[0, 1:].astype(int), "p": p[0, 1:],
+    })
+
+
+def _grouped_pearson(groups, x, y):
+    """Pearson r of x and y within each group, over the rows where both are present."""
+    both = x.notna() & y.notna()
+    frame = pd.DataFrame({"g": groups[both], "x": x[both], "y": y[both]})
+    frame = frame.assign(xx=frame["x"] ** 2, yy=frame["y"] ** 2, xy=frame["x"] * frame["y"])
+    sums = frame.groupby("g").agg(n=("x", "size"), x=("x", "sum"), y=("y", "sum"), xx=("xx", "sum"),
+                                  yy=("yy", "sum"), xy=("xy", "sum"))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sums["n"] * sums["xy"] - sums["x"] * sums["y"]
+        var = (sums["n"] * sums["xx"] - sums["x"] ** 2) * (sums["n"] * sums["yy"] - sums["y"] ** 2)
+        r = (cov / np.sqrt(var)).clip(-1, 1)
+    return r.where(sums["n"] > 2)
+
+
+def state_correlations(panel, lags=LAGS):
+    """Per-state r between demand_yoy and the area-weighted yield change, for each lag."""
+    return pd.DataFrame({
+        f"r_yield_lag{lag}": _grouped_pearson(panel["State"], panel["demand_yoy"], _lagged(panel, "yield_change", lag))
+        for lag in lags
+    }).rename_axis("State")
+
+
+class DistressPanel:
+    """The (State, year) distress panel with its lagged correlations, and per-year leaderboards."""
+
+    def __init__(self, crop_data, mgnrega, area_affected):
+        self.panel = build_panel(crop_data, mgnrega, area_affected)
+        self.correlations = lagged_correlations(self.panel)
+        self.state_correlations = state_correlations(self.panel)
+
+    @classmethod
+    def from_frames(cls, panel, correlations, state_correlations):
+        """Rebuild from previously computed frames without touching the data."""
+        self = cls.__new__(cls)
+        self.panel = panel
+        self.correlations = correlations
+        self.state_correlations = state_correlations
+        return self
+
+    @property
+    def years(self):
+        """Years with a demand change to rank, newest first."""
+        return sorted(self.panel.loc[self.panel["demand_yoy"].notna(), "year"].unique().tolist(), reverse=True)
+
+    def leaderboard(self, year):
+        """One row per state for ``year``, most distressed first.
+
+        distress_score is the mean, over the available indicators, of each
+        indicator's z-score across states (signed so that higher is worse).
+        """
+        rows = self.panel[self.panel["year"] == year].set_index("State")
+        scores = pd.DataFrame({
+            indicator: sign * (rows[indicator] - rows[indicator].mean()) / rows[indicator].std()
+            for indicator, sign in DISTRESS_SIGN.items()
+        })
+        board = rows.drop(columns=["year"]).assign(distress_score=scores.mean(axis=1))
+        board = board.join(self.state_correlations)
+        return board.sort_values("distress_score", ascending=False, na_position="last")
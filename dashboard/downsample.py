@@ -0,0 +1,137 @@
+"""Trend series reduced to a fixed point budget before they reach the browser.
+
+Rows sharing an x value (several districts or seasons in one year) are first
+aggregated to one point per x, keeping that x's min and max; rows that repeat
+the same record are counted once by sums. If more distinct x
+values remain than the budget (monthly data over decades), the aggregated line
+is downsampled with Largest-Triangle-Three-Buckets, which keeps the peaks and
+troughs a plain stride would skip, and the min/max envelope is widened to cover
+each bucket. The points sent per trace are therefore bounded by the budget no
+matter how many rows the series has.
+"""
+import os
+
+import numpy as np
+
+# Points per trace; override with DASHBOARD_CHART_POINTS
+DEFAULT_POINTS = int(os.environ.get("DASHBOARD_CHART_POINTS", 500))
+
+
+def _bucket_edges(n, budget):
+    """Bucket boundaries for LTTB: the first and last points alone, the rest split into budget - 2 buckets."""
+    inner = np.linspace(1, n - 1, budget - 1).astype(np.int64)
+    return np.concatenate([[0], inner, [n]])
+
+
+def lttb_indices(x, y, budget):
+    """Indices of the ``budget`` points Largest-Triangle-Three-Buckets keeps from (x, y).
+
+    ``x`` must be increasing and free of NaNs, as must ``y``. All indices are
+    returned when the series already fits.
+    """
+    n = len(x)
+    if budget >= n or budget < 3:
+        return np.arange(n)
+    x = np.asarray(x)
+    x = (x.view(np.int64) if x.dtype.kind == "M" else x).astype(np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = _bucket_edges(n, budget)
+    selected = np.empty(budget, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for b in range(1, budget - 1):
+        start, stop, next_stop = edges[b], edges[b + 1], edges[b + 2]
+        # The triangle's third corner is the mean of the next bucket
+        cx, cy = x[stop:next_stop].mean(), y[stop:next_stop].mean()
+        area = np.abs((x[a] - cx) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (cy - y[a]))
+        a = start + int(np.argmax(area))
+        selected[b] = a
+    return selected
+
+
+def _per_x(x, y, how):
+    """Sorted distinct x with the sum or mean, min and max of y at each (NaN y ignored)."""
+    keep = ~np.isnan(y)
+    x, y = x[keep], y[keep]
+    order = np.argsort(x, kind="stable")
+    x, y = x[order], y[order]
+    xs, starts, counts = np.unique(x, return_index=True, return_counts=True)
+    if not len(xs):
+        return xs, y, y, y, False
+    total = np.add.reduceat(y, starts)
+    if how == "sum":
+        # Individual rows are on a different scale from their total, so a sum has no per-x envelope
+        return xs, total, total, total, False
+    low = np.minimum.reduceat(y, starts)
+    high = np.maximum.reduceat(y, starts)
+    return xs, total / counts, low, high, bool((low != high).any())
+
+
+def first_occurrences(columns):
+    """Mask of the rows whose values across ``columns`` (equal-length arrays) no earlier row has; NaN equals NaN."""
+    n = len(columns[0])
+    first = np.ones(n, dtype=bool)
+    if n < 2:
+        return first
+    # Stable sort, so of equal rows the earliest comes first and only the ones after it are repeats
+    order = np.lexsort(columns[::-1])
+    repeat = np.ones(n - 1, dtype=bool)
+    for values in columns:
+        values = values[order]
+        same = values[1:] == values[:-1]
+        if values.dtype.kind == "f":
+            same |= np.isnan(values[1:]) & np.isnan(values[:-1])
+        repeat &= same
+    first[order[1:][repeat]] = False
+    return first
+
+
+def reduce_trend(x, y, how="mean", budget=DEFAULT_POINTS):
+    """{x, y, low, high} for one trace, with at most ``budget`` points.
+
+    ``how`` ("sum" or "mean") combines rows with the same x. ``low``/``high``
+    are the min/max envelope of the values each point stands for (raw rows for
+    a mean, per-x totals for a sum), or None when every point's min equals its max.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    xs, value, low, high, aggregated = _per_x(x, y, how)
+
+    if len(xs) > budget:
+        picked = lttb_indices(xs, value, budget)
+        edges = _bucket_edges(len(xs), budget)
+        low = np.minimum.reduceat(low, edges[:-1])
+        high = np.maximum.reduceat(high, edges[:-1])
+        xs, value = xs[picked], value[picked]
+        aggregated = bool((low != high).any())
+
+    return {
+        "x": np.datetime_as_string(xs).tolist() if xs.dtype.kind == "M" else xs.tolist(),
+        "y": value.tolist(),
+        "low": low.tolist() if aggregated else None,
+        "high": high.tolist() if aggregated else None,
+    }
+
+
+def _float_values(values):
+    if hasattr(values, "to_numpy"):
+        return values.to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.asarray(values, dtype=np.float64)
+
+
+def reduce_series(frame, x, columns, budget=DEFAULT_POINTS, distinct=None):
+    """{column: reduce_trend(...)} plus the raw row count, for ``columns`` ({column: "sum" | "mean"}) against ``x``.
+
+    ``frame`` is a DataFrame or a {column: array} mapping. ``distinct`` names
+    the columns that, with ``x``, identify a record: rows repeating a record are
+    counted once by the "sum" columns (means still average every row).
+    """
+    xs = np.asarray(frame[x])
+    once = slice(None)
+    if distinct:
+        once = first_occurrences([xs] + [_float_values(frame[column]) for column in distinct])
+    trends = {}
+    for column, how in columns.items():
+        rows = once if how == "sum" else slice(None)
+        trends[column] = reduce_trend(xs[rows], _float_values(frame[column])[rows], how, budget)
+    return {"points": len(xs), "columns": trends}
@@ -0,0 +1,76 @@
+"""Bounded LRU cache of rendered matplotlib figures stored as PNG bytes."""
+import io
+import threading
+from collections import OrderedDict
+
+from dashboard.instrumentation import recorder
+
+
+def figure_png(fig, dpi=200):
+    """Encode ``fig`` as PNG bytes and close it."""
+    import matplotlib.pyplot as plt  # already imported by whoever drew ``fig``
+
+    try:
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight")
+    finally:
+        plt.close(fig)
+    return buf.getvalue()
+
+
+class FigureCache:
+    """Render figures once per key and keep the PNG bytes, evicting least recently used past ``max_bytes``.
+
+    Figures are always closed after rendering, so pyplot never holds on to them.
+    Keys should identify everything the figure depends on, e.g.
+    ``(dataset, column, analysis, data_version)``.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, dpi=200):
+        self.max_bytes = max_bytes
+        self.dpi = dpi
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def size(self):
+        return self._size
+
+    def get(self, key):
+        with self._lock:
+            png = self._items.get(key)
+            if png is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return png
+
+    def put(self, key, png):
+        with self._lock:
+            if key in self._items:
+                self._size -= len(self._items.pop(key))
+            if len(png) > self.max_bytes:
+                return
+            self._items[key] = png
+            self._size += len(png)
+            while self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
+
+    def render(self, key, draw):
+        """PNG bytes for ``key``; on a miss ``draw()`` must return a matplotlib Figure."""
+        png = self.get(key)
+        if png is not None:
+            return png
+
+        with recorder.section("figure.render"):
+            png = figure_png(draw(), self.dpi)
+        self.put(key, png)
+        return png
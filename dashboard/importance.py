@@ -0,0 +1,152 @@
+"""Per-year RandomForests and their feature importances, trained in parallel and kept on disk.
+
+Each year's result is keyed by a hash of that year's feature/target data plus the
+forest hyperparameters, so reruns, restarts and other workers reuse earlier fits
+and only groups whose data changed are retrained. The fitted forests are stored
+next to their importances (``cache_dir/models``) as uncompressed joblib files,
+loaded memory-mapped, so predictions never need a retrain.
+"""
+import hashlib
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestRegressor
+
+from dashboard.instrumentation import recorder
+from dashboard.loader import CACHE_DIR, temp_path
+
+# In-process copy of the on-disk results, keyed like the files
+_memo = {}
+
+
+def frame_fingerprint(frame):
+    """Content hash of a DataFrame (values, column names and dtypes; not the index)."""
+    digest = hashlib.sha1()
+    digest.update(json.dumps([[str(c), str(t)] for c, t in frame.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _result_key(group, feature_cols, target_col, params):
+    digest = hashlib.sha1()
+    digest.update(frame_fingerprint(group[list(feature_cols) + [target_col]]).encode())
+    digest.update(json.dumps(params, sort_keys=True).encode())
+    return digest.hexdigest()[:20]
+
+
+def _fit(X, y, params):
+    return RandomForestRegressor(n_jobs=1, **params).fit(X, y)
+
+
+def _read_cached(path):
+    try:
+        with open(path) as fh:
+            return json.load(fh)["importances"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _model_path(cache_dir, key):
+    return os.path.join(cache_dir, "models", f"{key}.joblib")
+
+
+def load_model(path):
+    """A stored forest with its arrays memory-mapped, or None if missing or unreadable."""
+    try:
+        return joblib.load(path, mmap_mode="r")
+    except (OSError, ValueError, EOFError):
+        return None
+
+
+def _yearly_groups(frame, feature_cols, target_col, group_col, params):
+    for year, group in frame.groupby(group_col, observed=True):
+        yield year, _result_key(group, feature_cols, target_col, params), group
+
+
+def _train(pending, feature_cols, target_col, params, n_jobs, cache_dir):
+    """Fit a forest for every (year, key, group) in ``pending`` and store it with its importances.
+
+    Returns {year: forest}. Years are trained concurrently with joblib (``n_jobs`` workers).
+    """
+    with recorder.section(f"model.fit.{target_col}"):
+        fitted = Parallel(n_jobs=n_jobs)(
+            delayed(_fit)(group[list(feature_cols)], group[target_col], params) for _, _, group in pending
+        )
+    os.makedirs(os.path.join(cache_dir, "models"), exist_ok=True)
+    models = {}
+    for (year, key, _), model in zip(pending, fitted):
+        importances = model.feature_importances_.tolist()
+        _memo[key] = importances
+        # Another worker may have stored the same fit meanwhile (same key, same result): keep its file
+        path = _model_path(cache_dir, key)
+        if not os.path.exists(path):
+            tmp_path = temp_path(path)
+            joblib.dump(model, tmp_path)  # uncompressed, so it can be memory-mapped
+            os.replace(tmp_path, path)
+        path = os.path.join(cache_dir, "importance", f"{key}.json")
+        if not os.path.exists(path):
+            tmp_path = temp_path(path)
+            with open(tmp_path, "w") as fh:
+                json.dump({"features": list(feature_cols), "target": target_col, "params": params,
+                           "importances": importances}, fh)
+            os.replace(tmp_path, path)
+        models[year] = model
+    return models
+
+
+def yearly_feature_importance(frame, feature_cols, target_col, group_col, n_estimators=100,
+                              random_state=42, n_jobs=-1, cache_dir=CACHE_DIR):
+    """Return {year: importances} from one forest per ``group_col`` value.
+
+    Cached years are read from memory or ``cache_dir/importance``; the remaining
+    years are trained concurrently with joblib (``n_jobs`` workers).
+    """
+    params = {"n_estimators": n_estimators, "random_state": random_state}
+    os.makedirs(os.path.join(cache_dir, "importance"), exist_ok=True)
+
+    results, pending = {}, []
+    for year, key, group in _yearly_groups(frame, feature_cols, target_col, group_col, params):
+        if key not in _memo:
+            cached = _read_cached(os.path.join(cache_dir, "importance", f"{key}.json"))
+            if cached is not None:
+                _memo[key] = cached
+        recorder.cache_lookup("importance", hit=key in _memo)
+        if key in _memo:
+            results[year] = np.asarray(_memo[key])
+        else:
+            pending.append((year, key, group))
+
+    if pending:
+        for year, model in _train(pending, feature_cols, target_col, params, n_jobs, cache_dir).items():
+            results[year] = model.feature_importances_
+
+    return dict(sorted(results.items()))
+
+
+def yearly_models(frame, feature_cols, target_col, group_col, n_estimators=100,
+                  random_state=42, n_jobs=-1, cache_dir=CACHE_DIR):
+    """Return {year: fitted forest}, the same forests ``yearly_feature_importance`` uses.
+
+    Stored forests are loaded memory-mapped from ``cache_dir/models``; years
+    without one (e.g. importances cached before models were kept) are trained.
+    """
+    params = {"n_estimators": n_estimators, "random_state": random_state}
+    os.makedirs(os.path.join(cache_dir, "importance"), exist_ok=True)
+
+    models, pending = {}, []
+    for year, key, group in _yearly_groups(frame, feature_cols, target_col, group_col, params):
+        model = load_model(_model_path(cache_dir, key))
+        recorder.cache_lookup("model", hit=model is not None)
+        if model is not None:
+            models[year] = model
+        else:
+            pending.append((year, key, group))
+
+    if pending:
+        models.update(_train(pending, feature_cols, target_col, params, n_jobs, cache_dir))
+
+    return dict(sorted(models.items()))
@@ -0,0 +1,185 @@
+"""Process-wide timing, allocation and cache-hit counters for the dashboard.
+
+Wrap work in ``recorder.section("tab.Harvest")`` (or decorate with
+``recorder.timed(...)``) and report cache lookups with ``recorder.cache_lookup``.
+Totals accumulate across reruns and sessions and can be exported as JSON or in
+the Prometheus text format.
+
+Allocation figures need tracemalloc, which is only started when the
+``DASHBOARD_TRACE_MEMORY`` environment variable is set because tracing slows
+Python-heavy code considerably. tracemalloc is process-global, so with several
+sessions running at once a section's peak can include other sessions' memory.
+"""
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+if os.environ.get("DASHBOARD_TRACE_MEMORY") and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+
+def _new_section():
+    return {"calls": 0, "errors": 0, "seconds_total": 0.0, "seconds_max": 0.0, "seconds_last": 0.0,
+            "alloc_peak_bytes_max": None, "alloc_net_bytes_total": None}
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Recorder:
+    """Thread-safe accumulator of per-section timings and per-cache hit/miss counts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._sections = {}
+        self._caches = {}
+        self._gauges = {}
+        self.started = time.time()
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def section(self, name):
+        """Time the enclosed block (and its allocations when tracemalloc is tracing) under ``name``."""
+        tracing = tracemalloc.is_tracing()
+        stack = self._stack()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            # Fold the peak reached so far into the enclosing section before resetting it
+            if stack:
+                stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+            tracemalloc.reset_peak()
+            stack.append({"start": current, "peak": current})
+        failed = False
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            failed = True
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            alloc = None
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                frame = stack.pop()
+                peak = max(frame["peak"], peak)
+                if stack:
+                    stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+                alloc = (peak - frame["start"], current - frame["start"])
+            self.observe(name, seconds, alloc, failed)
+
+    def timed(self, name):
+        """Decorator form of ``section``."""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.section(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def observe(self, name, seconds, alloc=None, failed=False):
+        """Record one run of ``name``; ``alloc`` is (peak bytes, net bytes) or None."""
+        with self._lock:
+            stats = self._sections.setdefault(name, _new_section())
+            stats["calls"] += 1
+            stats["errors"] += failed
+            stats["seconds_total"] += seconds
+            stats["seconds_max"] = max(stats["seconds_max"], seconds)
+            stats["seconds_last"] = seconds
+            if alloc is not None:
+                peak, net = alloc
+                stats["alloc_peak_bytes_max"] = max(stats["alloc_peak_bytes_max"] or 0, peak)
+                stats["alloc_net_bytes_total"] = (stats["alloc_net_bytes_total"] or 0) + net
+
+    def cache_lookup(self, name, hit):
+        with self._lock:
+            counts = self._caches.setdefault(name, {"hits": 0, "misses": 0})
+            counts["hits" if hit else "misses"] += 1
+
+    def gauge(self, name, read):
+        """Report ``read()`` (a {metric: number} dict) under ``name`` in every snapshot."""
+        with self._lock:
+            self._gauges[name] = read
+
+    def reset(self):
+        with self._lock:
+            self._sections.clear()
+            self._caches.clear()
+            self.started = time.time()
+
+    def snapshot(self):
+        with self._lock:
+            sections = {name: dict(stats) for name, stats in self._sections.items()}
+            caches = {name: dict(counts) for name, counts in self._caches.items()}
+            gauges = dict(self._gauges)
+        return {
+            "started": self.started,
+            "tracing_memory": tracemalloc.is_tracing(),
+            "sections": sections,
+            "caches": caches,
+            "gauges": {name: read() for name, read in gauges.items()},
+        }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2, sort_keys=True)
+
+    def to_prometheus(self, prefix="dashboard"):
+        """The current snapshot in the Prometheus text exposition format."""
+        snap = self.snapshot()
+        lines = []
+
+        def family(metric, kind, help_text, samples):
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{_escape_label(val)}"' for key, val in labels.items())
+                lines.append(f"{prefix}_{metric}{{{label_text}}} {value}")
+
+        sections = sorted(snap["sections"].items())
+        family("section_calls_total", "counter", "Runs of each dashboard section.",
+               [({"section": name}, stats["calls"]) for name, stats in sections])
+        family("section_errors_total", "counter", "Runs of each section that raised.",
+               [({"section": name}, stats["errors"]) for name, stats in sections])
+        family("section_seconds_total", "counter", "Wall time spent in each section.",
+               [({"section": name}, f"{stats['seconds_total']:.6f}") for name, stats in sections])
+        family("section_seconds_max", "gauge", "Slowest run of each section.",
+               [({"section": name}, f"{stats['seconds_max']:.6f}") for name, stats in sections])
+        family("section_alloc_peak_bytes", "gauge", "Largest traced allocation peak within a section run.",
+               [({"section": name}, stats["alloc_peak_bytes_max"]) for name, stats in sections
+                if stats["alloc_peak_bytes_max"] is not None])
+
+        caches = sorted(snap["caches"].items())
+        family("cache_hits_total", "counter", "Cache lookups answered from the cache.",
+               [({"cache": name}, counts["hits"]) for name, counts in caches])
+        family("cache_misses_total", "counter", "Cache lookups that had to compute.",
+               [({"cache": name}, counts["misses"]) for name, counts in caches])
+
+        for name, values in sorted(snap["gauges"].items()):
+            family(name, "gauge", f"{name} gauges.",
+                   [({"metric": metric}, value) for metric, value in sorted(values.items())])
+        return "\n".join(lines) + "\n"
+
+    def export(self, directory):
+        """Write metrics.json and dashboard.prom (for a node_exporter textfile collector) to ``directory``."""
+        os.makedirs(directory, exist_ok=True)
+        for filename, text in (("metrics.json", self.to_json()), ("dashboard.prom", self.to_prometheus())):
+            path = os.path.join(directory, filename)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as fh:
+                fh.write(text)
+            os.replace(tmp_path, path)
+
+
+# Shared by every session of the app process
+recorder = Recorder()
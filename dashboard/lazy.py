@@ -0,0 +1,47 @@
+"""Deferred imports for the heavy analytics libraries.
+
+``charts = lazy_import("dashboard.charts")`` binds a stand-in module; the real
+import (matplotlib and seaborn, in that case) runs on the first attribute
+access and is timed under ``import.<name>``. Views that never touch a backend
+never pay for importing it, which keeps a fresh worker's first paint fast.
+"""
+import importlib
+import sys
+import threading
+import types
+from contextlib import nullcontext
+
+from dashboard.instrumentation import recorder
+
+# Reentrant: importing one lazily loaded module may touch another
+_lock = threading.RLock()
+
+
+class _LazyModule(types.ModuleType):
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            with _lock:
+                module = self.__dict__["_module"]
+                if module is None:
+                    # Only time imports that actually run
+                    timing = nullcontext() if self.__name__ in sys.modules else recorder.section(f"import.{self.__name__}")
+                    with timing:
+                        module = importlib.import_module(self.__name__)
+                    self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name):
+    """A module object for ``name`` that imports it on first use."""
+    return _LazyModule(name)
@@ -0,0 +1,219 @@
+"""Load the dashboard CSVs through a columnar (Arrow IPC) on-disk cache.
+
+Each CSV is parsed once, normalised (BOM-free headers, categorical State/Crop,
+downcast numerics) and written to an uncompressed Arrow file that can be
+memory-mapped on the next start. Cache entries are keyed by the source file's
+size, mtime and SHA-1, so editing a CSV invalidates its entry automatically.
+Rows added through ``append_rows`` go into extra segments instead.
+"""
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.environ.get("DASHBOARD_CACHE_DIR", os.path.join(DATA_DIR, ".cache"))
+
+SOURCES = {
+    "crop_data": "Crop_data.csv",
+    "area_affected": "Area_affected.csv",
+    "mgnrega": "mgnrega.csv",
+    "wpi": "dataset1.csv",
+}
+CATEGORICAL_COLUMNS = ["State", "Crop"]
+
+
+def file_fingerprint(path, previous=None):
+    """Return {size, mtime_ns, sha1} for path, reusing the hash if size/mtime are unchanged."""
+    stat = os.stat(path)
+    if previous and previous.get("size") == stat.st_size and previous.get("mtime_ns") == stat.st_mtime_ns:
+        return dict(previous)
+
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            sha1.update(block)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha1": sha1.hexdigest()}
+
+
+def compact_frame(df):
+    """Strip header BOMs/whitespace, make State/Crop categorical and downcast numeric columns."""
+    df = df.rename(columns=lambda c: c.replace("\ufeff", "").strip())
+    for column in df.columns:
+        if column in CATEGORICAL_COLUMNS:
+            df[column] = df[column].astype("category")
+        elif pd.api.types.is_integer_dtype(df[column]):
+            df[column] = pd.to_numeric(df[column], downcast="integer")
+        elif pd.api.types.is_float_dtype(df[column]):
+            df[column] = pd.to_numeric(df[column], downcast="float")
+    return df
+
+
+def read_csv_compact(path):
+    return compact_frame(pd.read_csv(path, encoding="utf-8-sig"))
+
+
+def temp_path(path):
+    """A name next to ``path`` unique to this process and thread, to write to before ``os.replace``.
+
+    Workers starting on one cache directory write the same files at once; a
+    shared temp name would let one move or replace another's half-written file.
+    """
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _read_manifest(manifest_path):
+    try:
+        with open(manifest_path) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(manifest_path, manifest):
+    tmp_path = temp_path(manifest_path)
+    with open(tmp_path, "w") as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def _read_segments(columnar_dir, segments):
+    tables = [feather.read_table(os.path.join(columnar_dir, segment), memory_map=True) for segment in segments]
+    # Appended segments may have been downcast differently or carry new categories
+    table = tables[0] if len(tables) == 1 else pa.concat_tables(tables, promote_options="permissive")
+    return table.to_pandas(split_blocks=True)
+
+
+def _write_segment(columnar_dir, segment, df):
+    # Uncompressed so the file can be memory-mapped without decoding
+    path = os.path.join(columnar_dir, segment)
+    tmp_path = temp_path(path)
+    feather.write_feather(df, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+
+
+def _drop_stale_segments(columnar_dir, name, segments):
+    for entry in os.listdir(columnar_dir):
+        if entry.startswith(f"{name}-") and entry.endswith(".arrow") and entry not in segments:
+            try:
+                os.remove(os.path.join(columnar_dir, entry))
+            except FileNotFoundError:
+                pass  # another worker dropped it first
+
+
+def load_table(name, data_dir=DATA_DIR, cache_dir=CACHE_DIR):
+    """Load one source as a compact DataFrame, converting the CSV to Arrow on a cache miss.
+
+    The cache for a source is a list of Arrow segments: one for the CSV as first
+    parsed plus one per ``append_rows`` call, so appending a year never re-parses
+    the rows that were already there.
+    """
+    columnar_dir = os.path.join(cache_dir, "columnar")
+    os.makedirs(columnar_dir, exist_ok=True)
+    manifest_path = os.path.join(columnar_dir, "manifest.json")
+    manifest = _read_manifest(manifest_path)
+
+    source_path = os.path.join(data_dir, SOURCES[name])
+    entry = manifest.get(name) or {}
+    fingerprint = file_fingerprint(source_path, entry)
+    segments = entry.get("segments") or [f"{name}-{entry.get('sha1', '')[:16]}.arrow"]
+
+    if entry.get("sha1") == fingerprint["sha1"] and all(os.path.exists(os.path.join(columnar_dir, s)) for s in segments):
+        df = _read_segments(columnar_dir, segments)
+    else:
+        df = read_csv_compact(source_path)
+        segments = [f"{name}-{fingerprint['sha1'][:16]}.arrow"]
+        _write_segment(columnar_dir, segments[0], df)
+        # Drop entries built from older versions of this CSV
+        _drop_stale_segments(columnar_dir, name, segments)
+
+    fingerprint["segments"] = segments
+    if entry != fingerprint:
+        manifest[name] = fingerprint
+        _write_manifest(manifest_path, manifest)
+    return df
+
+
+def _match_dtypes(new, existing):
+    """Cast ``new`` numeric columns to the dtypes already cached, where that keeps their values.
+
+    Keeping the dtypes stable means concatenated segments hash the same as before
+    for the old rows (see dashboard.importance.frame_fingerprint). Columns that
+    don't fit are left as parsed.
+    """
+    for column in new.columns:
+        target = existing[column].dtype
+        if column in CATEGORICAL_COLUMNS or new[column].dtype == target or not pd.api.types.is_numeric_dtype(target):
+            continue
+        with np.errstate(invalid="ignore", over="ignore"):
+            cast = new[column].astype(target) if not new[column].isna().any() or target.kind == "f" else None
+        if cast is not None and np.allclose(cast.to_numpy(np.float64), new[column].to_numpy(np.float64), rtol=0.0, equal_nan=True):
+            new[column] = cast
+    return new
+
+
+def append_rows(name, rows, data_dir=DATA_DIR, cache_dir=CACHE_DIR):
+    """Append ``rows`` (same columns as the source) to a source CSV and to its columnar cache.
+
+    Only the new rows are parsed and written; the existing segments are kept as
+    they are, unless the new rows need a wider dtype than a cached column has,
+    in which case the whole CSV is parsed again. Returns the new rows in compact
+    form.
+    """
+    columnar_dir = os.path.join(cache_dir, "columnar")
+    source_path = os.path.join(data_dir, SOURCES[name])
+    # Make sure the cache reflects the CSV before it grows
+    current = load_table(name, data_dir, cache_dir)
+    missing = [c for c in current.columns if c not in rows.columns]
+    if missing:
+        raise ValueError(f"{SOURCES[name]} rows are missing columns: {missing}")
+
+    with open(source_path, "rb") as fh:
+        size = fh.seek(0, os.SEEK_END)
+        if size:
+            fh.seek(-1, os.SEEK_END)
+        needs_newline = size > 0 and fh.read(1) not in (b"\n", b"\r")
+    with open(source_path, "a", newline="") as fh:
+        if needs_newline:
+            fh.write("\r\n")
+        rows[list(current.columns)].to_csv(fh, header=False, index=False, lineterminator="\r\n")
+
+    # Raw values go straight to the cached dtypes (downcasting them first would round them twice)
+    new_rows = _match_dtypes(rows[list(current.columns)].reset_index(drop=True), current)
+    if any(new_rows[c].dtype != current[c].dtype for c in new_rows.columns if c not in CATEGORICAL_COLUMNS):
+        # A column needs a wider dtype than the cached rows have: re-parse the whole CSV (the manifest
+        # no longer matches it), so the cache holds what a fresh parse of the file gives
+        return load_table(name, data_dir, cache_dir).iloc[len(current):].reset_index(drop=True)
+    new_rows = new_rows.assign(**{c: new_rows[c].astype("category") for c in new_rows.columns if c in CATEGORICAL_COLUMNS})
+
+    manifest_path = os.path.join(columnar_dir, "manifest.json")
+    manifest = _read_manifest(manifest_path)
+    entry = manifest[name]
+    fingerprint = file_fingerprint(source_path)
+    segment = f"{name}-{fingerprint['sha1'][:16]}.arrow"
+    _write_segment(columnar_dir, segment, new_rows)
+
+    fingerprint["segments"] = entry["segments"] + [segment]
+    manifest[name] = fingerprint
+    _write_manifest(manifest_path, manifest)
+    return new_rows
+
+
+def load_all(data_dir=DATA_DIR, cache_dir=CACHE_DIR):
+    """Return (crop_data, area_affected, mgnrega) as compact DataFrames (the WPI table is loaded on its own)."""
+    return tuple(load_table(name, data_dir, cache_dir) for name in ("crop_data", "area_affected", "mgnrega"))
+
+
+def data_version(data_dir=DATA_DIR, cache_dir=CACHE_DIR):
+    """Short hash identifying the current contents of all sources."""
+    manifest = _read_manifest(os.path.join(cache_dir, "columnar", "manifest.json"))
+    digest = hashlib.sha1()
+    for name, filename in SOURCES.items():
+        fingerprint = file_fingerprint(os.path.join(data_dir, filename), manifest.get(name))
+        digest.update(f"{name}:{fingerprint['sha1']};".encode())
+    return digest.hexdigest()[:16]
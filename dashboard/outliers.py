@@ -0,0 +1,101 @@
+"""Quartiles, IQR fences and outlier rows for every numeric column, in memory or streamed in chunks."""
+import numpy as np
+import pandas as pd
+
+
+def detect_outliers(frame, id_columns=None, whisker=1.5):
+    """Return (stats, outliers) for the numeric columns of ``frame``.
+
+    ``stats`` has one row per column with quartiles, the IQR fences and the box
+    whiskers (most extreme values inside the fences, as Plotly draws them).
+    ``outliers`` lists every value outside the fences with its column, row label
+    and the row's ``id_columns`` (non-numeric columns by default).
+    """
+    columns = [c for c in frame.select_dtypes(include=["number"]).columns if frame[c].notna().any()]
+    if id_columns is None:
+        id_columns = [c for c in frame.columns if c not in frame.select_dtypes(include=["number"]).columns]
+    values = frame[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    q1, median, q3 = np.nanquantile(values, [0.25, 0.5, 0.75], axis=0)
+    iqr = q3 - q1
+    lower, upper = q1 - whisker * iqr, q3 + whisker * iqr
+    present = ~np.isnan(values)
+    inside = present & (values >= lower) & (values <= upper)
+    outside = present & ~inside
+
+    stats = pd.DataFrame({
+        "count": present.sum(axis=0),
+        "q1": q1,
+        "median": median,
+        "q3": q3,
+        "iqr": iqr,
+        "lower_fence": lower,
+        "upper_fence": upper,
+        "whisker_low": np.where(inside, values, np.inf).min(axis=0),
+        "whisker_high": np.where(inside, values, -np.inf).max(axis=0),
+        "n_outliers": outside.sum(axis=0),
+    }, index=pd.Index(columns, name="column"))
+
+    rows, cols = np.nonzero(outside)
+    outliers = frame[id_columns].iloc[rows].reset_index(names="row")
+    outliers.insert(0, "column", np.asarray(columns, dtype=object)[cols])
+    outliers["value"] = values[rows, cols]
+    outliers["side"] = np.where(outliers["value"].to_numpy() < lower[cols], "low", "high")
+    return stats, outliers.sort_values(["column", "row"], kind="stable").reset_index(drop=True)
+
+
+def detect_outliers_chunks(make_chunks, quartiles, id_columns, whisker=1.5):
+    """Streaming ``detect_outliers`` for data read in chunks, in one pass.
+
+    ``quartiles`` is {column: (q1, median, q3)}, e.g. estimated by
+    dashboard.stats.summarize_chunks; ``make_chunks`` returns an iterable of
+    DataFrame chunks. Row labels are positions in chunk order.
+    """
+    columns = list(quartiles)
+    q1, median, q3 = np.array([quartiles[c] for c in columns], dtype=np.float64).reshape(len(columns), 3).T
+    iqr = q3 - q1
+    lower, upper = q1 - whisker * iqr, q3 + whisker * iqr
+
+    count = np.zeros(len(columns), dtype=np.int64)
+    n_outliers = np.zeros(len(columns), dtype=np.int64)
+    whisker_low = np.full(len(columns), np.inf)
+    whisker_high = np.full(len(columns), -np.inf)
+    found, offset = [], 0
+    for chunk in make_chunks():
+        values = chunk[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        present = ~np.isnan(values)
+        inside = present & (values >= lower) & (values <= upper)
+        outside = present & ~inside
+        count += present.sum(axis=0)
+        n_outliers += outside.sum(axis=0)
+        whisker_low = np.minimum(whisker_low, np.where(inside, values, np.inf).min(axis=0, initial=np.inf))
+        whisker_high = np.maximum(whisker_high, np.where(inside, values, -np.inf).max(axis=0, initial=-np.inf))
+
+        rows, cols = np.nonzero(outside)
+        if len(rows):
+            part = chunk[id_columns].iloc[rows].reset_index(drop=True)
+            part.insert(0, "row", rows + offset)
+            part.insert(0, "column", np.asarray(columns, dtype=object)[cols])
+            part["value"] = values[rows, cols]
+            part["side"] = np.where(part["value"].to_numpy() < lower[cols], "low", "high")
+            found.append(part)
+        offset += len(chunk)
+
+    stats = pd.DataFrame({
+        "count": count,
+        "q1": q1,
+        "median": median,
+        "q3": q3,
+        "iqr": iqr,
+        "lower_fence": lower,
+        "upper_fence": upper,
+        "whisker_low": whisker_low,
+        "whisker_high": whisker_high,
+        "n_outliers": n_outliers,
+    }, index=pd.Index(columns, name="column"))
+
+    if found:
+        outliers = pd.concat(found, ignore_index=True)
+    else:
+        outliers = pd.DataFrame(columns=["column", "row", *id_columns, "value", "side"])
+    return stats, outliers.sort_values(["column", "row"], kind="stable").reset_index(drop=True)
@@ -0,0 +1,310 @@
+"""One (State, Crop, year) panel joining all four datasets, built once per data version.
+
+Crop_data is the finest grain. Each crop row gets the WPI of its (State, Crop,
+year) from dataset1.csv and the position of its (State, year) row in a second,
+state-level table that holds the MGNREGA and Area_affected columns joined on
+the same key (plus the state's mean WPI that year). Both levels are plain numpy
+arrays in their loaded (downcast) dtypes, with State and Crop as integer codes,
+sorted by one int64 composite key. A state, (state, crop) or (state, crop,
+year) is then a contiguous row range found by binary search, and the per-crop
+offsets inside each state are precomputed, so views slice the arrays instead
+of filtering and re-joining the source frames.
+
+With a CropStore the crop rows stay on disk: ``rows`` reads just the matching
+partitions and attaches WPI and the state-level position from the same arrays.
+"""
+import numpy as np
+import pandas as pd
+
+from dashboard.cropstore import CropStore
+from dashboard.downsample import first_occurrences
+
+CROP_YEAR = "Crop_Year"
+YEAR = "year"
+# Year column of each state-level source, as named in its CSV
+SOURCE_YEARS = {"mgnrega": "year", "area": "Year"}
+WPI = "WPI"
+# Position of a crop row's (State, year) row in the state-level table, -1 if it has none
+STATE_YEAR = "_state_year"
+# Crop_data repeats some (State, Crop, year) rows that differ only in Harvest_Price: with these
+# columns they identify one record, whose Area and Production sums count once
+CROP_RECORD = ["Area_(in_Ha)", "Production_(in_Tonnes)"]
+
+
+def _lookup(sorted_keys, keys):
+    """Position of each of ``keys`` in the sorted, unique ``sorted_keys``, or -1."""
+    positions = np.searchsorted(sorted_keys, keys)
+    found = positions < len(sorted_keys)
+    found[found] = sorted_keys[positions[found]] == keys[found]
+    return np.where(found, positions, -1)
+
+
+class UnifiedPanel:
+    """Crop rows with WPI, pointing at their (State, year) MGNREGA and Area_affected row."""
+
+    def __init__(self, crop_data, wpi, mgnrega, area_affected):
+        self.store = crop_data if isinstance(crop_data, CropStore) else None
+        sample = self.store.empty() if self.store is not None else crop_data
+        self.crop_columns = list(sample.columns)
+
+        crop_states = self.store.states() if self.store is not None else crop_data["State"].unique()
+        crop_crops = self.store.crops() if self.store is not None else crop_data["Crop"].unique()
+        crop_years = self.store.years() if self.store is not None else crop_data[CROP_YEAR].unique()
+        frames = (wpi, mgnrega, area_affected)
+        self.states = sorted({str(s) for s in crop_states}.union(*({str(s) for s in f["State"].unique()} for f in frames)))
+        self.crops = sorted({str(c) for c in crop_crops} | {str(c) for c in wpi["Crop"].unique()})
+        self.years = np.array(sorted({int(y) for y in crop_years} | {int(y) for y in wpi[CROP_YEAR].unique()}
+                                     | {int(y) for y in mgnrega[YEAR].unique()} | {int(y) for y in area_affected["Year"].unique()}))
+
+        self._state_index = {state: i for i, state in enumerate(self.states)}
+        self._crop_index = {crop: i for i, crop in enumerate(self.crops)}
+        self._year_index = {int(year): i for i, year in enumerate(self.years)}
+
+        self._build_state_years(wpi, mgnrega, area_affected)
+        # WPI by (State, Crop, year) key, first row per key
+        wpi_keys = self._key(self._state_codes(wpi["State"]), self._crop_codes(wpi["Crop"]), wpi[CROP_YEAR].to_numpy())
+        self._wpi_keys, first = np.unique(wpi_keys, return_index=True)
+        self._wpi_values = wpi[WPI].to_numpy()[first]
+        if self.store is None:
+            self._build_crop_rows(crop_data)
+
+    # Keys -------------------------------------------------------------------
+
+    @staticmethod
+    def _codes(values, index):
+        # Map each distinct value once, then every row through its category code
+        values = pd.Series(values).astype("category")
+        mapping = np.array([index[str(value)] for value in values.cat.categories] + [-1], dtype=np.int64)
+        return mapping[values.cat.codes.to_numpy()]
+
+    def _state_codes(self, values):
+        return self._codes(values, self._state_index)
+
+    def _crop_codes(self, values):
+        return self._codes(values, self._crop_index)
+
+    def _year_codes(self, values):
+        return np.searchsorted(self.years, np.asarray(values, dtype=np.int64))
+
+    def _key(self, states, crops, years):
+        """Composite (State, Crop, year) key, ordered like the three codes."""
+        return (states * len(self.crops) + crops) * len(self.years) + self._year_codes(years)
+
+    def _state_year_key(self, states, years):
+        return states * len(self.years) + self._year_codes(years)
+
+    # Construction -----------------------------------------------------------
+
+    def _build_state_years(self, wpi, mgnrega, area_affected):
+        sources = {"mgnrega": mgnrega, "area": area_affected}
+        keys = {name: self._state_year_key(self._state_codes(frame["State"]), frame[SOURCE_YEARS[name]].to_numpy())
+                for name, frame in sources.items()}
+        self._state_year_keys = np.unique(np.concatenate(list(keys.values())))
+        n = len(self._state_year_keys)
+        year_dtype = np.result_type(*(frame[SOURCE_YEARS[name]].dtype for name, frame in sources.items()))
+        self.state_year = {
+            "State": (self._state_year_keys // len(self.years)).astype(np.int32),
+            YEAR: self.years[self._state_year_keys % len(self.years)].astype(year_dtype),
+        }
+        # Each source's columns keep their dtypes; rows the source doesn't have are 0 (NaN for floats)
+        self.source_columns = {}
+        self.present = {}
+        for name, frame in sources.items():
+            self.source_columns[name] = list(frame.columns)
+            positions = _lookup(self._state_year_keys, keys[name])
+            self.present[name] = np.zeros(n, dtype=bool)
+            self.present[name][positions] = True
+            for column in frame.columns:
+                if column in ("State", SOURCE_YEARS[name]):
+                    continue
+                values = frame[column].to_numpy()
+                filled = np.full(n, np.nan, dtype=values.dtype) if values.dtype.kind == "f" else np.zeros(n, dtype=values.dtype)
+                filled[positions] = values
+                self.state_year[column] = filled
+
+        # The state's mean WPI over the crops dataset1 lists for that year
+        positions = _lookup(self._state_year_keys, self._state_year_key(self._state_codes(wpi["State"]), wpi[CROP_YEAR].to_numpy()))
+        values = wpi[WPI].to_numpy(dtype=np.float64)
+        keep = (positions >= 0) & ~np.isnan(values)
+        counts = np.bincount(positions[keep], minlength=n)
+        with np.errstate(invalid="ignore"):
+            mean = np.bincount(positions[keep], weights=values[keep], minlength=n) / counts
+        self.state_year[WPI] = mean.astype(wpi[WPI].dtype)
+        self.present["wpi"] = counts > 0
+
+    def _build_crop_rows(self, crop_data):
+        states = self._state_codes(crop_data["State"])
+        keys = self._key(states, self._crop_codes(crop_data["Crop"]), crop_data[CROP_YEAR].to_numpy())
+        order = np.argsort(keys, kind="stable")
+        self._crop_keys = keys[order]
+        self.crop = {}
+        for column in self.crop_columns:
+            values = crop_data[column]
+            self.crop[column] = (self._state_codes(values) if column == "State" else self._crop_codes(values)
+                                 if column == "Crop" else values.to_numpy())[order]
+        self.crop["State"] = self.crop["State"].astype(np.int32)
+        self.crop["Crop"] = self.crop["Crop"].astype(np.int32)
+        self.crop[WPI] = self._wpi_of(self._crop_keys)
+        self.crop[STATE_YEAR] = self._state_year_of(self.crop["State"].astype(np.int64), self.crop[CROP_YEAR])
+        # First row of every (State, Crop), and the end of the last one
+        pairs = self._crop_keys // len(self.years)
+        self._pairs, starts = np.unique(pairs, return_index=True)
+        self._pair_offsets = np.append(starts, len(pairs))
+
+    def _wpi_of(self, keys):
+        positions = _lookup(self._wpi_keys, keys)
+        return np.where(positions >= 0, self._wpi_values[np.maximum(positions, 0)], np.nan).astype(self._wpi_values.dtype)
+
+    def _state_year_of(self, states, years):
+        return _lookup(self._state_year_keys, self._state_year_key(states, years)).astype(np.int32)
+
+    # Reads ------------------------------------------------------------------
+
+    def _frame(self, arrays, rows, columns):
+        data = {}
+        for column in columns:
+            values = arrays[column][rows]
+            if column == "State":
+                values = pd.Categorical.from_codes(values, categories=self.states)
+            elif column == "Crop":
+                values = pd.Categorical.from_codes(values, categories=self.crops)
+            data[column] = values
+        return pd.DataFrame(data, copy=False)
+
+    def _state_level(self, column, positions):
+        """State-level ``column`` for crop rows whose (State, year) rows are at ``positions``."""
+        values = self.state_year[column][np.maximum(positions, 0)]
+        return values if (positions >= 0).all() else np.where(positions >= 0, values.astype(np.float64), np.nan)
+
+    def _arrays(self, rows, columns):
+        """{column: array} for crop ``rows``, State and Crop as codes."""
+        return {column: self.crop[column][rows] if column in self.crop else self._state_level(column, self.crop[STATE_YEAR][rows])
+                for column in columns}
+
+    def _store_rows(self, state, crop, year, columns):
+        frame = self.store.rows(state, crop, year)
+        states = self._state_codes(frame["State"])
+        years = frame[CROP_YEAR].to_numpy()
+        frame[WPI] = self._wpi_of(self._key(states, self._crop_codes(frame["Crop"]), years))
+        positions = self._state_year_of(states, years)
+        for column in columns:
+            if column not in frame:
+                frame[column] = self._state_level(column, positions)
+        return frame[columns]
+
+    def rows(self, state, crop=None, year=None, columns=None):
+        """Crop rows of ``state`` (and ``crop``, ``year``) ordered by Crop then year, with their WPI.
+
+        ``columns`` may also name state-level columns (e.g. ``Employment_demanded``),
+        which are taken from each row's (State, year) row.
+        """
+        columns = list(columns) if columns is not None else self.crop_columns + [WPI]
+        if self.store is not None:
+            return self._store_rows(state, crop, year, columns)
+        start, stop = self._range(state, crop, year)
+        return self._frame(self._arrays(slice(start, stop), columns), slice(None), columns)
+
+    def _range(self, state, crop=None, year=None):
+        """(start, stop) of the crop rows under a key prefix (empty for unknown values)."""
+        n_crops, n_years = len(self.crops), len(self.years)
+        state_code = self._state_index.get(state)
+        crop_code = self._crop_index.get(crop) if crop is not None else 0
+        year_code = self._year_index.get(int(year)) if year is not None else 0
+        if state_code is None or crop_code is None or year_code is None:
+            return 0, 0
+        if crop is None:
+            low, high = state_code * n_crops * n_years, (state_code + 1) * n_crops * n_years
+        elif year is None:
+            low = (state_code * n_crops + crop_code) * n_years
+            high = low + n_years
+        else:
+            low = (state_code * n_crops + crop_code) * n_years + year_code
+            high = low + 1
+        start, stop = np.searchsorted(self._crop_keys, [low, high])
+        return int(start), int(stop)
+
+    def crop_groups(self, state, columns):
+        """(crop, {column: array}) for every crop grown in ``state``, in crop order, rows ordered by year."""
+        columns = list(columns)
+        if self.store is not None:
+            rows = self.rows(state, columns=list(dict.fromkeys(["Crop"] + columns)))
+            for crop, group in rows.groupby("Crop", observed=True, sort=True):
+                yield str(crop), {column: group[column].to_numpy() for column in columns}
+            return
+        state_code = self._state_index.get(state)
+        if state_code is None:
+            return
+        # Precomputed (State, Crop) offsets: each crop is a slice, no grouping or frame building
+        first, last = np.searchsorted(self._pairs // len(self.crops), [state_code, state_code + 1])
+        for i in range(first, last):
+            rows = slice(self._pair_offsets[i], self._pair_offsets[i + 1])
+            yield self.crops[self._pairs[i] % len(self.crops)], self._arrays(rows, columns)
+
+    def state_rows(self, state, source):
+        """The (State, year) rows ``source`` ("mgnrega" or "area") has for ``state``, with its CSV columns."""
+        state_code = self._state_index.get(state)
+        if state_code is None:
+            return self._frame(self.state_year, slice(0, 0), ["State", YEAR]).rename(columns={YEAR: SOURCE_YEARS[source]})
+        start, stop = np.searchsorted(self._state_year_keys, [state_code * len(self.years), (state_code + 1) * len(self.years)])
+        rows = start + np.flatnonzero(self.present[source][start:stop])
+        frame = self._frame(self.state_year, rows, ["State", YEAR] + [c for c in self.source_columns[source] if c in self.state_year])
+        return frame.rename(columns={YEAR: SOURCE_YEARS[source]})[self.source_columns[source]]
+
+    def source_years(self, source):
+        """Sorted years with rows in ``source`` ("mgnrega", "area" or "wpi")."""
+        return sorted(int(year) for year in np.unique(self.state_year[YEAR][self.present[source]]))
+
+    def state_year_frame(self, crop_aggregates, distinct=None):
+        """One row per (State, year) with MGNREGA, crop and Area_affected data.
+
+        Crop columns are rolled up per ``crop_aggregates`` ({column: "sum" | "mean"},
+        NaNs skipped); WPI is the state's mean over its crops that year. Rows
+        repeating a record (same State, Crop, year and ``distinct`` columns) are
+        counted once by the sums.
+        """
+        n = len(self._state_year_keys)
+        distinct = list(distinct or [])
+        if self.store is not None:
+            crop = self.store.aggregate(["State", CROP_YEAR], crop_aggregates,
+                                        distinct=["Crop"] + distinct if distinct else None).reset_index()
+            positions = self._state_year_of(self._state_codes(crop["State"]), crop[CROP_YEAR].to_numpy())
+            keep = positions >= 0
+            has_crop = np.zeros(n, dtype=bool)
+            has_crop[positions[keep]] = True
+            rolled = {}
+            for column in crop_aggregates:
+                rolled[column] = np.full(n, np.nan)
+                rolled[column][positions[keep]] = crop[column].to_numpy(dtype=np.float64)[keep]
+        else:
+            positions = self.crop[STATE_YEAR].astype(np.int64)
+            linked = positions >= 0
+            has_crop = np.bincount(positions[linked], minlength=n) > 0
+            once = linked
+            if distinct:
+                # Repeats share a composite (State, Crop, year) key, and rows are sorted by it: only rows
+                # next to one with the same key need their ``distinct`` columns compared
+                keys = self._crop_keys
+                same = keys[1:] == keys[:-1]
+                shared = np.flatnonzero(np.append(same, False) | np.insert(same, 0, False))
+                once = linked.copy()
+                once[shared] &= first_occurrences([keys[shared]] + [self.crop[column][shared] for column in distinct])
+            rolled = {}
+            for column, how in crop_aggregates.items():
+                values = self.crop[column].astype(np.float64)
+                keep = (once if how == "sum" else linked) & ~np.isnan(values)
+                total = np.bincount(positions[keep], weights=values[keep], minlength=n)
+                if how == "sum":
+                    rolled[column] = total
+                else:
+                    with np.errstate(invalid="ignore"):
+                        rolled[column] = total / np.bincount(positions[keep], minlength=n)
+
+        rows = np.flatnonzero(self.present["mgnrega"] & has_crop & self.present["area"])
+        mgnrega, area = ([c for c in self.source_columns[source] if c in self.state_year and c not in ("State", YEAR)]
+                         for source in ("mgnrega", "area"))
+        frame = self._frame(self.state_year, rows, ["State", YEAR] + mgnrega)
+        for column in crop_aggregates:
+            frame[column] = rolled[column][rows]
+        for column in area + [WPI]:
+            frame[column] = self.state_year[column][rows]
+        return frame
@@ -0,0 +1,42 @@
+"""Contiguous row-range index over a frame sorted by its key columns."""
+import numpy as np
+
+
+class PartitionIndex:
+    """Sort a frame once by ``keys`` (then ``order_by``) and map every key prefix to a row range.
+
+    ``rows("Bihar")`` and ``rows("Bihar", "Rice")`` are dictionary lookups that return
+    positional slices of the sorted frame, so no boolean mask is built per call.
+    """
+
+    def __init__(self, frame, keys, order_by=None):
+        self.keys = list(keys)
+        self.order_by = order_by
+        sort_columns = self.keys + ([order_by] if order_by else [])
+        self.frame = frame.sort_values(sort_columns, kind="stable")
+        self._ranges = self._build_ranges()
+
+    def _build_ranges(self):
+        n = len(self.frame)
+        ranges = {}
+        changed = np.zeros(n, dtype=bool)
+        if n:
+            changed[0] = True
+        for depth, key in enumerate(self.keys, start=1):
+            values = self.frame[key].to_numpy()
+            changed[1:] |= values[1:] != values[:-1]
+            starts = np.flatnonzero(changed)
+            stops = np.append(starts[1:], n)
+            key_values = [self.frame[k].to_numpy()[starts] for k in self.keys[:depth]]
+            for i, (start, stop) in enumerate(zip(starts, stops)):
+                ranges[tuple(values_[i] for values_ in key_values)] = (int(start), int(stop))
+        return ranges
+
+    def bounds(self, *key):
+        """(start, stop) positions of ``key`` in the sorted frame, or (0, 0) if absent."""
+        return self._ranges.get(key, (0, 0))
+
+    def rows(self, *key):
+        """Rows matching ``key`` (a prefix of the index keys), ordered by ``order_by``."""
+        start, stop = self.bounds(*key)
+        return self.frame.iloc[start:stop]
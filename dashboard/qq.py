@@ -0,0 +1,91 @@
+"""Normal QQ-plot points and normality statistics for every numeric column.
+
+All columns are sorted together once. Sample quantiles are taken at a fixed
+number of probability levels, so the plotted point count does not grow with the
+row count. With ``max_points`` >= n the points are exactly the order statistics
+against Hazen plotting positions. NaNs are dropped per column.
+"""
+import numpy as np
+from scipy import stats
+
+# Shapiro-Wilk is only defined up to 5000 observations; larger columns are subsampled
+SHAPIRO_MAX_N = 5000
+
+
+def _anderson_darling(sorted_values):
+    """A² for normality (mean/std estimated) with the Stephens small-sample correction, and its p-value."""
+    n = len(sorted_values)
+    z = (sorted_values - sorted_values.mean()) / sorted_values.std(ddof=1)
+    i = np.arange(1, n + 1)
+    a2 = -n - np.sum((2 * i - 1) * (stats.norm.logcdf(z) + stats.norm.logsf(z[::-1]))) / n
+    a2_star = a2 * (1 + 0.75 / n + 2.25 / n ** 2)
+    # D'Agostino & Stephens (1986), Table 4.9
+    if a2_star >= 0.6:
+        # The quadratic term turns the curve back up past A² ~ 153, where p is already ~1e-190
+        a = min(a2_star, 153.0)
+        p = np.exp(1.2937 - 5.709 * a + 0.0186 * a ** 2)
+    elif a2_star >= 0.34:
+        p = np.exp(0.9177 - 4.279 * a2_star - 1.38 * a2_star ** 2)
+    elif a2_star >= 0.2:
+        p = 1 - np.exp(-8.318 + 42.796 * a2_star - 59.938 * a2_star ** 2)
+    else:
+        p = 1 - np.exp(-13.436 + 101.14 * a2_star - 223.73 * a2_star ** 2)
+    return float(a2_star), float(min(max(p, 0.0), 1.0))
+
+
+def qq_points(frame, max_points=300, seed=0):
+    """{column: QQ data} for every numeric column of ``frame`` with at least 3 values.
+
+    Each entry holds ``theoretical``/``sample`` quantile arrays, the standardized
+    reference line (``slope``, ``intercept``, like statsmodels ``line='s'``),
+    ``n``, Shapiro-Wilk ``shapiro_w``/``shapiro_p`` and Anderson-Darling
+    ``anderson_a2``/``anderson_p``.
+    """
+    columns = [c for c in frame.select_dtypes(include=["number"]).columns if frame[c].count() >= 3]
+    if not columns:
+        return {}
+    values = frame[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+    ordered = np.sort(values, axis=0)  # NaNs sort to the end of each column
+    counts = (~np.isnan(values)).sum(axis=0)
+
+    # Shared probability levels; Hazen positions (i - 0.5) / k pick exact order statistics when k == n
+    k = int(min(max_points, counts.max()))
+    probs = (np.arange(1, k + 1) - 0.5) / k
+    theoretical = stats.norm.ppf(probs)
+    # Hazen quantiles read straight from the sorted columns: 0-based position n * p - 0.5, interpolated
+    position = np.clip(counts[None, :] * probs[:, None] - 0.5, 0, counts[None, :] - 1)
+    below = np.floor(position).astype(np.int64)
+    above = np.minimum(below + 1, counts[None, :] - 1)
+    cols = np.arange(len(columns))[None, :]
+    frac = position - below
+    sample = ordered[below, cols] * (1 - frac) + ordered[above, cols] * frac
+
+    means = np.nanmean(values, axis=0)
+    stds = np.nanstd(values, axis=0)
+    rng = np.random.default_rng(seed)
+
+    result = {}
+    for j, column in enumerate(columns):
+        column_values = ordered[:counts[j], j]
+        if counts[j] > SHAPIRO_MAX_N:
+            shapiro_sample = rng.choice(column_values, SHAPIRO_MAX_N, replace=False)
+        else:
+            shapiro_sample = column_values
+        if np.ptp(column_values) > 0:
+            shapiro_w, shapiro_p = stats.shapiro(shapiro_sample)
+            anderson_a2, anderson_p = _anderson_darling(column_values)
+        else:
+            shapiro_w = shapiro_p = anderson_a2 = anderson_p = np.nan
+
+        result[column] = {
+            "n": int(counts[j]),
+            "theoretical": theoretical,
+            "sample": sample[:, j],
+            "slope": float(stds[j]),
+            "intercept": float(means[j]),
+            "shapiro_w": float(shapiro_w),
+            "shapiro_p": float(shapiro_p),
+            "anderson_a2": anderson_a2,
+            "anderson_p": anderson_p,
+        }
+    return result
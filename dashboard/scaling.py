@@ -0,0 +1,38 @@
+"""Min-max scaled copies of the loaded frames, computed once per data version."""
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+
+
+def _read_only(values):
+    """A non-writeable copy of a column's values (a Categorical keeps read-only codes)."""
+    if isinstance(values, pd.Categorical):
+        codes = values.codes.copy()
+        codes.flags.writeable = False
+        return pd.Categorical.from_codes(codes, dtype=values.dtype)
+    values = values.copy()
+    values.flags.writeable = False
+    return values
+
+
+class ScaledView:
+    """Fit a MinMaxScaler on ``columns`` of ``frame`` once and keep the scaled copy read-only.
+
+    The source frame is never modified. Every ``frame`` access builds a new
+    DataFrame over the same non-writeable arrays, so an in-place write raises
+    ValueError and assigning a column only changes the caller's frame: the
+    cached copy every session shares cannot be altered.
+    """
+
+    def __init__(self, frame, columns):
+        self.columns = list(columns)
+        self.scaler = MinMaxScaler().fit(frame[self.columns])
+        scaled = dict(zip(self.columns, self.scaler.transform(frame[self.columns]).T))
+        self._index = frame.index
+        self._values = {column: _read_only(scaled[column] if column in scaled else
+                                           frame[column].array if isinstance(frame[column].dtype, pd.CategoricalDtype)
+                                           else frame[column].to_numpy())
+                        for column in frame.columns}
+
+    @property
+    def frame(self):
+        return pd.DataFrame(self._values, index=self._index, copy=False)
@@ -0,0 +1,171 @@
+"""Process-wide cache of models and heavy results, shared by every session.
+
+``results.get_or_compute(key, compute)`` returns the cached value for ``key``
+or runs ``compute()`` to produce it. A lookup of a key that another thread is
+already computing waits for that computation instead of starting its own
+(single flight), so fifty sessions opening the Harvest tab at once train the
+per-year forests once. Entries are evicted least recently used once their
+estimated size passes ``max_bytes`` (``DASHBOARD_RESULT_CACHE_MB``, default
+1024). Sizes count numpy arrays, pandas columns and the containers holding
+them; memory-mapped arrays count as nothing because the OS can drop their
+pages, so the bound is approximate.
+
+``WarmUp`` is a background thread that runs a list of loaders once, so the
+common views are already cached when the first visitor asks for them.
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from dashboard.instrumentation import recorder
+
+MAX_BYTES = int(os.environ.get("DASHBOARD_RESULT_CACHE_MB", 1024)) * 1024 * 1024
+# States to precompute at boot: a number (the most populous states) or comma-separated names; empty = off
+WARM_UP = os.environ.get("DASHBOARD_WARM_UP", "")
+
+
+def estimate_size(value, _seen=None):
+    """Approximate bytes held by ``value`` (memory-mapped arrays count as 0)."""
+    # Keeps every visited object alive, so temporary state dicts can't reuse an id seen earlier
+    seen = {} if _seen is None else _seen
+    if id(value) in seen:
+        return 0
+    seen[id(value)] = value
+    if isinstance(value, np.ndarray):
+        if isinstance(value, np.memmap) or isinstance(value.base, np.memmap):
+            return 0
+        return value.nbytes
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        return int(np.sum(value.memory_usage(deep=True)))
+    if isinstance(value, (str, bytes, int, float, bool, type(None))):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k, seen) + estimate_size(v, seen) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_size(item, seen) for item in value)
+    # Objects are measured by their pickled state (for sklearn trees, the node and value arrays)
+    state = value.__getstate__() if hasattr(value, "__getstate__") else getattr(value, "__dict__", None)
+    if isinstance(state, dict):
+        return sys.getsizeof(value) + estimate_size(state, seen)
+    return sys.getsizeof(value)
+
+
+class _Flight:
+    """One computation in progress; waiters block on ``done``."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SharedCache:
+    """Thread-safe LRU of computed values bounded by estimated bytes, computing each key once at a time."""
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.evictions = 0
+        self._items = OrderedDict()
+        self._size = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._items
+
+    @property
+    def size(self):
+        return self._size
+
+    def get_or_compute(self, key, compute):
+        """The cached value for ``key``, or ``compute()``'s result (computed by one thread only)."""
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key][0]
+            flight = self._flights.get(key)
+            owner = flight is None
+            if owner:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+            else:
+                self.waits += 1
+
+        if not owner:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+        except BaseException as error:
+            flight.error = error
+            raise
+        else:
+            self.put(key, flight.value)
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.value
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._items:
+                self._size -= self._items.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._items[key] = (value, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self._size -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "waits": self.waits, "evictions": self.evictions,
+                "entries": len(self._items), "bytes": self._size}
+
+
+class WarmUp(threading.Thread):
+    """Daemon thread calling each of ``tasks`` once, timed under ``warmup``; a failing task is counted and skipped."""
+
+    def __init__(self, tasks):
+        super().__init__(name="dashboard-warm-up", daemon=True)
+        self.tasks = list(tasks)
+        self.completed = 0
+        self.failed = 0
+
+    def run(self):
+        with recorder.section("warmup"):
+            for task in self.tasks:
+                try:
+                    with recorder.section("warmup.task"):
+                        task()
+                except Exception:
+                    self.failed += 1
+                else:
+                    self.completed += 1
+
+
+# The one instance every session shares
+results = SharedCache()
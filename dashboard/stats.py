@@ -0,0 +1,166 @@
+"""Vectorized summary statistics for every numeric column of a dataset.
+
+``summarize`` computes moments, quartiles, histogram counts, a Gaussian KDE grid
+and the fitted normal curve for all numeric columns with whole-matrix NumPy
+operations. ``summarize_chunks`` produces the same structure from an iterable
+of chunks (e.g. ``pd.read_csv(..., chunksize=...)``) in two streaming passes,
+with quantiles estimated from a fine histogram.
+"""
+import numpy as np
+
+# Fine histogram resolution per display bin, used for the KDE and streamed quantiles
+FINE_BINS_PER_BIN = 32
+
+
+def numeric_columns(frame):
+    return list(frame.select_dtypes(include=["number"]).columns)
+
+
+def _bin_edges(mins, maxs, bins):
+    # Constant columns get a unit-wide range around the value, like np.histogram
+    lo = np.where(maxs > mins, mins, mins - 0.5)
+    hi = np.where(maxs > mins, maxs, maxs + 0.5)
+    return lo, hi
+
+
+def _histogram_2d(values, lo, hi, bins):
+    """Per-column histogram counts (columns x bins) for a 2D array, NaNs ignored."""
+    n_cols = values.shape[1]
+    width = (hi - lo) / bins
+    with np.errstate(invalid="ignore"):
+        idx = np.floor((values - lo) / width)
+    valid = ~np.isnan(idx) & (idx >= 0) & (values <= hi)
+    idx = np.clip(np.nan_to_num(idx), 0, bins - 1).astype(np.int64)
+    flat = (idx + np.arange(n_cols) * bins)[valid]
+    return np.bincount(flat, minlength=n_cols * bins).reshape(n_cols, bins)
+
+
+def _quantiles_from_histogram(fine_counts, lo, hi, probs):
+    """Linearly interpolated quantiles from per-column fine histograms."""
+    n_cols, n_bins = fine_counts.shape
+    cdf = np.cumsum(fine_counts, axis=1)
+    total = cdf[:, -1:]
+    width = (hi - lo) / n_bins
+    out = np.full((len(probs), n_cols), np.nan)
+    rows = np.arange(n_cols)
+    for j, p in enumerate(probs):
+        target = p * total[:, 0]
+        pos = np.minimum((cdf < target[:, None]).sum(axis=1), n_bins - 1)
+        before = np.where(pos > 0, cdf[rows, pos - 1], 0)
+        in_bin = fine_counts[rows, pos]
+        frac = np.where(in_bin > 0, (target - before) / np.maximum(in_bin, 1), 0.0)
+        out[j] = np.where(total[:, 0] > 0, lo + (pos + frac) * width, np.nan)
+    return out
+
+
+def _finalize(columns, count, mean, std, mins, maxs, quartiles, fine_counts, bins, grid_points):
+    lo, hi = _bin_edges(mins, maxs, bins)
+    n_cols = len(columns)
+    fine_bins = fine_counts.shape[1]
+    hist_counts = fine_counts.reshape(n_cols, bins, fine_bins // bins).sum(axis=2)
+
+    # Binned Gaussian KDE (Scott's rule) evaluated on the data range, scaled to histogram counts
+    grid = lo[:, None] + (hi - lo)[:, None] * np.linspace(0, 1, grid_points)[None, :]
+    centres = lo[:, None] + (hi - lo)[:, None] * (np.arange(fine_bins) + 0.5)[None, :] / fine_bins
+    bandwidth = np.where((std > 0) & (count > 1), std * np.maximum(count, 1) ** -0.2, 1.0)
+    z = (grid[:, :, None] - centres[:, None, :]) / bandwidth[:, None, None]
+    density = np.einsum("cgf,cf->cg", np.exp(-0.5 * z * z), fine_counts) / (
+        np.sqrt(2 * np.pi) * bandwidth[:, None] * np.maximum(count, 1)[:, None])
+    bin_width = (hi - lo) / bins
+    kde = density * count[:, None] * bin_width[:, None]
+
+    # Normal curve with the column's mean/std, scaled the same way
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gz = (grid - mean[:, None]) / std[:, None]
+        gaussian = np.exp(-0.5 * gz * gz) / (np.sqrt(2 * np.pi) * std[:, None]) * count[:, None] * bin_width[:, None]
+
+    summary = {}
+    for i, column in enumerate(columns):
+        summary[column] = {
+            "count": int(count[i]),
+            "mean": float(mean[i]),
+            "std": float(std[i]),
+            "min": float(mins[i]),
+            "max": float(maxs[i]),
+            "q1": float(quartiles[0, i]),
+            "median": float(quartiles[1, i]),
+            "q3": float(quartiles[2, i]),
+            "hist_edges": np.linspace(lo[i], hi[i], bins + 1),
+            "hist_counts": hist_counts[i],
+            "grid": grid[i],
+            "kde": kde[i],
+            "gaussian": gaussian[i],
+        }
+    return summary
+
+
+def summarize(frame, bins=20, grid_points=100):
+    """{column: stats} for every numeric column of ``frame`` that has at least one value."""
+    columns = [c for c in numeric_columns(frame) if frame[c].notna().any()]
+    if not columns:
+        return {}
+    values = frame[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+
+    count = (~np.isnan(values)).sum(axis=0)
+    mean = np.nanmean(values, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        std = np.nanstd(values, axis=0, ddof=1)
+    mins = np.nanmin(values, axis=0)
+    maxs = np.nanmax(values, axis=0)
+    quartiles = np.nanquantile(values, [0.25, 0.5, 0.75], axis=0)
+
+    lo, hi = _bin_edges(mins, maxs, bins)
+    fine_counts = _histogram_2d(values, lo, hi, bins * FINE_BINS_PER_BIN)
+    return _finalize(columns, count, mean, std, mins, maxs, quartiles, fine_counts, bins, grid_points)
+
+
+def summarize_chunks(make_chunks, columns=None, bins=20, grid_points=100):
+    """Streaming version of ``summarize`` for data that does not fit in memory.
+
+    ``make_chunks`` is a zero-argument callable returning a fresh iterable of
+    DataFrame chunks; it is called twice (moments/range, then histograms).
+    Median and quartiles are interpolated from a fine histogram.
+    """
+    count = total = m2 = mins = maxs = None
+    for chunk in make_chunks():
+        if columns is None:
+            columns = numeric_columns(chunk)
+        values = chunk[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        n = (~np.isnan(values)).sum(axis=0)
+        if count is None:
+            count = np.zeros(len(columns))
+            total = np.zeros(len(columns))
+            m2 = np.zeros(len(columns))
+            mins = np.full(len(columns), np.inf)
+            maxs = np.full(len(columns), -np.inf)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            chunk_mean = np.where(n > 0, np.nansum(values, axis=0) / np.maximum(n, 1), 0.0)
+            chunk_m2 = np.nansum((values - chunk_mean) ** 2, axis=0)
+            # Chan et al. pairwise merge of mean/M2
+            mean_so_far = np.where(count > 0, total / np.maximum(count, 1), 0.0)
+            delta = chunk_mean - mean_so_far
+            merged = count + n
+            m2 = m2 + chunk_m2 + delta ** 2 * count * n / np.maximum(merged, 1)
+        count, total = merged, total + np.nansum(values, axis=0)
+        if values.shape[0]:
+            mins = np.minimum(mins, np.where(np.isnan(values), np.inf, values).min(axis=0))
+            maxs = np.maximum(maxs, np.where(np.isnan(values), -np.inf, values).max(axis=0))
+
+    if count is None:
+        return {}
+    keep = count > 0
+    columns = [c for c, k in zip(columns, keep) if k]
+    count, total, m2, mins, maxs = count[keep], total[keep], m2[keep], mins[keep], maxs[keep]
+    mean = total / count
+    with np.errstate(invalid="ignore", divide="ignore"):
+        std = np.sqrt(m2 / (count - 1))
+
+    lo, hi = _bin_edges(mins, maxs, bins)
+    fine_bins = bins * FINE_BINS_PER_BIN
+    fine_counts = np.zeros((len(columns), fine_bins), dtype=np.int64)
+    for chunk in make_chunks():
+        values = chunk[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        fine_counts += _histogram_2d(values, lo, hi, fine_bins)
+
+    quartiles = _quantiles_from_histogram(fine_counts, lo, hi, [0.25, 0.5, 0.75])
+    return _finalize(columns, count, mean, std, mins, maxs, quartiles, fine_counts, bins, grid_points)
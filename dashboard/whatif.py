@@ -0,0 +1,72 @@
+"""Batched what-if predictions from the stored per-year forests.
+
+A scenario is a set of changes, each scaling one feature by a percentage for
+every state or for one state, e.g. ``Annual_rainfall -20%`` everywhere. All
+scenarios are applied to the base rows at once as a (scenario, row, feature)
+array of multipliers, and each year's forest predicts every scenario of its
+rows in a single ``predict`` call, so nothing is retrained.
+"""
+import numpy as np
+import pandas as pd
+
+# Columns of a change table (one row per change; rows sharing a scenario name combine)
+CHANGE_COLUMNS = ["scenario", "feature", "change_pct", "state"]
+BASELINE = "Baseline"
+
+
+def scenario_factors(base, features, changes):
+    """(scenario names, multipliers of shape scenario x row x feature) for a change table.
+
+    An empty or missing ``state`` applies the change to every row. Changes to
+    the same feature in one scenario compound.
+    """
+    unknown = sorted(set(changes["feature"]) - set(features))
+    if unknown:
+        raise ValueError(f"unknown features {unknown}; expected some of {list(features)}")
+    names = list(dict.fromkeys(changes["scenario"]))
+    states = base["State"].astype(str).to_numpy()
+    factors = np.ones((len(names), len(base), len(features)))
+    for change in changes.itertuples(index=False):
+        rows = slice(None) if pd.isna(change.state) or change.state == "" else states == change.state
+        factors[names.index(change.scenario), rows, list(features).index(change.feature)] *= 1 + change.change_pct / 100
+    return names, factors
+
+
+def predict_scenarios(models, base, features, changes, year_col, id_columns=("State",)):
+    """Predictions for every scenario in ``changes`` and every row of ``base``.
+
+    ``models`` is {year: fitted regressor}; each row is predicted by the model of
+    its ``year_col`` value (rows of years without a model are dropped). Returns a
+    long frame with the ``id_columns``, ``scenario``, ``baseline`` (the model's
+    prediction for the unchanged row), ``predicted`` and ``change_pct``.
+    """
+    changes = pd.DataFrame(changes, columns=CHANGE_COLUMNS).dropna(subset=["scenario", "feature", "change_pct"])
+    base = base[base[year_col].isin(list(models))].reset_index(drop=True)
+    names, factors = scenario_factors(base, features, changes)
+    values = base[list(features)].to_numpy(dtype=np.float64)
+    # Row 0 of the stack is the unchanged data
+    stacked = np.concatenate([values[None], values[None] * factors])
+
+    predicted = np.empty(stacked.shape[:2])
+    years = base[year_col].to_numpy()
+    for year, model in models.items():
+        rows = np.flatnonzero(years == year)
+        if len(rows):
+            block = stacked[:, rows, :].reshape(-1, len(features))
+            predicted[:, rows] = model.predict(pd.DataFrame(block, columns=list(features))).reshape(len(stacked), len(rows))
+
+    ids = base[list(id_columns) + [year_col]]
+    baseline = predicted[0]
+    frames = [ids.assign(scenario=name, baseline=baseline, predicted=predicted[i + 1]) for i, name in enumerate(names)]
+    result = pd.concat(frames, ignore_index=True) if frames else ids.assign(scenario=BASELINE, baseline=baseline, predicted=baseline)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result["change_pct"] = (result["predicted"] / result["baseline"] - 1) * 100
+    return result
+
+
+def scenario_summary(predictions):
+    """Per scenario: row count, mean baseline and predicted value, and the change of the mean in percent."""
+    summary = predictions.groupby("scenario", sort=False).agg(
+        rows=("predicted", "size"), baseline=("baseline", "mean"), predicted=("predicted", "mean"))
+    summary["change_pct"] = (summary["predicted"] / summary["baseline"] - 1) * 100
+    return summary
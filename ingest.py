@@ -0,0 +1,89 @@
+"""Append a new year of data without re-reading or retraining the years already loaded.
+
+    python ingest.py --crop crop_2024.csv --mgnrega mgnrega_2024.csv --area area_2024.csv [--wpi wpi_2024.csv] [--precompute]
+
+Each file must have the same columns as the source it extends and only contain
+years that source doesn't have yet. The rows are appended to the source CSV and
+written as a new segment of its columnar cache, so only the new rows are
+parsed. The per-year forests are then brought up to date: earlier years hit the
+importance cache and only the new years are trained. The app derives the
+latest/previous year from the data, so nothing else needs to change.
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from dashboard import artifacts, loader
+from dashboard.instrumentation import recorder
+
+# loader source name -> (command line option, year column)
+INPUTS = {
+    "crop_data": ("crop", artifacts.HARVEST_YEAR),
+    "mgnrega": ("mgnrega", artifacts.MGNREGA_YEAR),
+    "area_affected": ("area", "Year"),
+    "wpi": ("wpi", "Crop_Year"),
+}
+
+
+def read_new_rows(path):
+    rows = pd.read_csv(path, encoding="utf-8-sig")
+    return rows.rename(columns=lambda c: c.replace("\ufeff", "").strip())
+
+
+def ingest(paths, data_dir=loader.DATA_DIR, cache_dir=loader.CACHE_DIR):
+    """Append ``paths`` ({source name: csv path}) and return {source name: new years}.
+
+    Every file is checked (columns and years) before any is appended, so a bad
+    one leaves all the sources as they were.
+    """
+    new_rows = {}
+    for name, path in paths.items():
+        year_col = INPUTS[name][1]
+        rows = read_new_rows(path)
+        existing = loader.load_table(name, data_dir, cache_dir)
+        missing = [c for c in existing.columns if c not in rows.columns]
+        if missing:
+            raise ValueError(f"{path}: missing {loader.SOURCES[name]} columns {missing}")
+        overlap = sorted({int(year) for year in rows[year_col].unique()} & {int(year) for year in existing[year_col].unique()})
+        if overlap:
+            raise ValueError(f"{path}: {loader.SOURCES[name]} already has rows for {overlap}")
+        new_rows[name] = rows
+
+    added = {}
+    for name, rows in new_rows.items():
+        loader.append_rows(name, rows, data_dir, cache_dir)
+        added[name] = sorted(int(year) for year in rows[INPUTS[name][1]].unique())
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    for name, (option, _) in INPUTS.items():
+        parser.add_argument(f"--{option}", help=f"new rows for {loader.SOURCES[name]}")
+    parser.add_argument("--precompute", action="store_true", help="rebuild the precomputed bundle afterwards")
+    args = parser.parse_args()
+
+    paths = {name: getattr(args, option) for name, (option, _) in INPUTS.items() if getattr(args, option)}
+    if not paths:
+        parser.error("nothing to ingest")
+
+    start = time.perf_counter()
+    for name, years in ingest(paths).items():
+        print(f"{loader.SOURCES[name]}: appended {years}")
+
+    crop_data, area_affected, mgnrega = loader.load_all()
+    artifacts.harvest_importances(crop_data)
+    artifacts.mgnrega_importances(mgnrega)
+    trained = recorder.snapshot()["caches"].get("importance", {})
+    print(f"Feature importances: {trained.get('misses', 0)} year models trained, {trained.get('hits', 0)} reused")
+    print(f"Latest years: {artifacts.metric_years(mgnrega)}")
+
+    if args.precompute:
+        import precompute
+        print(f"Wrote {precompute.build()}")
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Precompute everything the dashboard shows into a versioned bundle.
+
+    python precompute.py [--out bundle/] [--workers N]
+
+Computes the summary statistics, outliers, QQ data, correlation matrices, the
+all-states distress panel, per-year feature importances and every state's metric cards and trend series,
+renders the static figures, and writes them under ``<out>/<data_version>/``.
+When a bundle for the current data version exists, Streamlit.py serves from it
+and does no aggregation or model training at request time.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from dashboard import artifacts, charts, cropstore, loader
+from dashboard.bundle import DEFAULT_BUNDLE_DIR, BundleWriter, image_file, slug, write_frame, write_json
+from dashboard.figures import figure_png
+
+DPI = 200
+
+
+def _save_image(path, key, fig):
+    relative = image_file(key)
+    with open(os.path.join(path, relative), "wb") as fh:
+        fh.write(figure_png(fig, DPI))
+    return {"key": list(key), "file": relative}
+
+
+def dataset_job(path, label):
+    """Summaries, outliers and QQ data for one dataset, plus its histogram and QQ images."""
+    frames = artifacts.dataset_frames(*cropstore.load_all())
+    frame = {label: frames[label]}
+    name = artifacts.DATASETS[label]
+
+    summary = artifacts.summaries(frame)[label]
+    qq = artifacts.qq_data(frame)[label]
+    box_stats, outlier_rows = artifacts.outliers(frame)[label]
+
+    write_json(os.path.join(path, "summaries", f"{name}.json"), summary)
+    write_json(os.path.join(path, "qq", f"{name}.json"), qq)
+    write_frame(os.path.join(path, "outliers", f"{name}-stats.arrow"), box_stats.reset_index())
+    write_frame(os.path.join(path, "outliers", f"{name}-rows.arrow"), outlier_rows)
+
+    images = [_save_image(path, (label, column, "histogram"), charts.histogram_figure(stats)) for column, stats in summary.items()]
+    images += [_save_image(path, (label, column, "qq"), charts.qq_figure(points)) for column, points in qq.items()]
+    return images
+
+
+def correlation_job(path):
+    correlations = artifacts.correlations(artifacts.unified_panel(*cropstore.load_all(), loader.load_table("wpi")))
+    write_frame(os.path.join(path, "correlation", "panel.arrow"), correlations.panel)
+    write_frame(os.path.join(path, "correlation", "counts.arrow"), correlations.counts.rename_axis("column").reset_index())
+    for method, (corr, p_values) in correlations.matrices.items():
+        write_frame(os.path.join(path, "correlation", f"{method}-corr.arrow"), corr.rename_axis("column").reset_index())
+        write_frame(os.path.join(path, "correlation", f"{method}-p.arrow"), p_values.rename_axis("column").reset_index())
+    return []
+
+
+def distress_job(path):
+    distress = artifacts.distress(*cropstore.load_all())
+    write_frame(os.path.join(path, "distress", "panel.arrow"), distress.panel)
+    write_frame(os.path.join(path, "distress", "correlations.arrow"), distress.correlations)
+    write_frame(os.path.join(path, "distress", "state-correlations.arrow"), distress.state_correlations.reset_index())
+    return []
+
+
+def importance_job(path, model):
+    """Per-year forests for one model (trained serially; the pool already runs jobs in parallel)."""
+    crop_data, area_affected, mgnrega = cropstore.load_all()
+    if model == "harvest":
+        importances = artifacts.harvest_importances(crop_data, n_jobs=1)
+        features = artifacts.harvest_feature_columns(crop_data)
+        images = [_save_image(path, ("Crop Data", artifacts.HARVEST_TARGET, "feature_importance"),
+                              charts.importance_bar_figure(importances, features))]
+    else:
+        importances = artifacts.mgnrega_importances(mgnrega, n_jobs=1)
+        features = artifacts.MGNREGA_FEATURES
+        images = [_save_image(path, ("Production Data", int(year), "feature_importance"),
+                              charts.importance_pie_figure(values, features))
+                  for year, values in importances.items()]
+
+    write_json(os.path.join(path, "importance", f"{model}.json"),
+               {"features": list(features), "years": {str(year): values for year, values in importances.items()}})
+    return images
+
+
+def states_job(path, states):
+    crop_data, area_affected, mgnrega = cropstore.load_all()
+    panel = artifacts.unified_panel(crop_data, area_affected, mgnrega, loader.load_table("wpi"))
+    mgnrega_scaled = artifacts.scaled_index(artifacts.scaled_views(mgnrega))
+    for state in states:
+        view = artifacts.state_view(state, panel, mgnrega_scaled)
+        write_json(os.path.join(path, "states", f"{slug(state)}.json"), view)
+    return []
+
+
+def build(out=DEFAULT_BUNDLE_DIR, workers=None):
+    """Write the bundle for the current data version and return its directory."""
+    # Populate the columnar cache (and crop store) once here so the workers only read them
+    crop_data, area_affected, mgnrega = cropstore.load_all()
+    version = cropstore.data_version()
+    states = sorted(str(state) for state in mgnrega["State"].unique())
+
+    writer = BundleWriter(out, version)
+    os.makedirs(os.path.join(writer.path, "images"))
+
+    workers = workers or os.cpu_count() or 1
+    batches = [states[i::workers] for i in range(min(workers, len(states)))]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = [pool.submit(dataset_job, writer.path, label) for label in artifacts.DATASETS]
+        jobs.append(pool.submit(correlation_job, writer.path))
+        jobs.append(pool.submit(distress_job, writer.path))
+        jobs += [pool.submit(importance_job, writer.path, model) for model in ("harvest", "mgnrega")]
+        jobs += [pool.submit(states_job, writer.path, batch) for batch in batches]
+        images = [image for job in jobs for image in job.result()]
+
+    return writer.finish({"states": states, "images": images})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default=DEFAULT_BUNDLE_DIR, help="bundle root directory (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    path = build(args.out, args.workers)
+    print(f"Wrote {path} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from dashboard.correlation import pairwise_spearman
+from dashboard.panel import CROP_RECORD, UnifiedPanel
+
+
+def test_spearman_ranks_each_pair_over_its_complete_rows():
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.normal(size=(200, 4)), columns=list("abcd"))
+    frame.loc[rng.integers(0, 200, 40), "b"] = np.nan
+    frame.loc[rng.integers(0, 200, 30), "c"] = np.nan
+    frame["d"] = frame["d"].round()  # ties
+    r, n = pairwise_spearman(frame.to_numpy())
+    np.testing.assert_allclose(r, frame.corr(method="spearman").to_numpy(), atol=1e-12)
+    assert n[1, 2] == frame[["b", "c"]].dropna().shape[0]
+
+
+def test_repeated_crop_records_are_summed_once():
+    crop = pd.DataFrame({
+        "State": ["Bihar"] * 4, "Crop": ["Maize", "Maize", "Rice", "Rice"], "Crop_Year": [2022] * 4,
+        "Area_(in_Ha)": [10.0, 10.0, 5.0, 5.0], "Production_(in_Tonnes)": [40.0, 40.0, 7.0, 9.0],
+        "Harvest_Price": [1.0, 3.0, 2.0, 2.0],
+    })
+    wpi = pd.DataFrame({"State": ["Bihar"], "Crop": ["Maize"], "Crop_Year": [2022], "WPI": [150.0]})
+    mgnrega = pd.DataFrame({"State": ["Bihar"], "year": [2022], "Employment_demanded": [100.0]})
+    area = pd.DataFrame({"State": ["Bihar"], "Year": [2022], "Area_aff": [1.5]})
+    panel = UnifiedPanel(crop, wpi, mgnrega, area)
+
+    aggregates = {"Area_(in_Ha)": "sum", "Production_(in_Tonnes)": "sum", "Harvest_Price": "mean"}
+    row = panel.state_year_frame(aggregates, distinct=CROP_RECORD).iloc[0]
+    # Maize's two rows are one record; Rice's differ in production, so both count
+    assert row["Area_(in_Ha)"] == 20.0
+    assert row["Production_(in_Tonnes)"] == 56.0
+    assert row["Harvest_Price"] == 2.0
@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+
+from dashboard import cropstore
+from dashboard.distress import crop_yield_changes
+
+
+@pytest.fixture
+def crop():
+    # Maize 2022 is one record listed twice with different prices; Rice 2022 has two records
+    return pd.DataFrame({
+        "State": ["Bihar"] * 6, "Crop": ["Maize", "Maize", "Maize", "Rice", "Rice", "Rice"],
+        "Crop_Year": [2021, 2022, 2022, 2021, 2022, 2022],
+        "Area_(in_Ha)": [10.0, 10.0, 10.0, 8.0, 5.0, 3.0], "Production_(in_Tonnes)": [20.0, 40.0, 40.0, 8.0, 10.0, 3.0],
+        "Yield_(kg/Ha)": [2000.0, 4000.0, 4000.0, 1000.0, 2000.0, 1000.0], "Harvest_Price": [1.0, 1.5, 2.5, 1.0, 1.0, 1.0],
+    })
+
+
+@pytest.mark.parametrize("stored", [False, True])
+def test_repeated_crop_records_are_summed_once(tmp_path, crop, stored):
+    data = crop
+    if stored:
+        crop.to_csv(tmp_path / "crop.csv", index=False)
+        data = cropstore.build(str(tmp_path / "crop.csv"), str(tmp_path / "store"))
+    changes = crop_yield_changes(data)
+    changes = changes.assign(State=changes["State"].astype(str), Crop=changes["Crop"].astype(str))
+    latest = changes[changes["year"] == 2022].set_index("Crop")
+
+    assert latest.loc["Maize", "area"] == 10.0
+    assert latest.loc["Maize", "yield"] == 4000.0
+    assert latest.loc["Rice", "area"] == 8.0
+    assert latest.loc["Rice", "yield"] == pytest.approx((5 * 2000 + 3 * 1000) / 8)
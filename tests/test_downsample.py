@@ -0,0 +1,30 @@
+import numpy as np
+
+from dashboard.downsample import reduce_series, reduce_trend
+
+
+def test_repeated_records_are_summed_once():
+    # Two copies of 2022 differing only in price, plus a second 2022 record
+    rows = {
+        "year": np.array([2021, 2022, 2022, 2022]),
+        "area": np.array([10.0, 20.0, 20.0, 5.0]),
+        "price": np.array([1.0, 2.0, 4.0, 3.0]),
+    }
+    series = reduce_series(rows, "year", {"area": "sum", "price": "mean"}, distinct=["area"])
+    assert series["points"] == 4
+    assert series["columns"]["area"]["y"] == [10.0, 25.0]
+    assert series["columns"]["price"]["y"] == [1.0, 3.0]
+    assert series["columns"]["price"]["low"] == [1.0, 2.0]
+
+
+def test_no_envelope_when_rows_agree():
+    trend = reduce_trend(np.array([2021, 2021, 2022]), np.array([5.0, 5.0, 7.0]))
+    assert trend["y"] == [5.0, 7.0]
+    assert trend["low"] is None and trend["high"] is None
+
+
+def test_downsampled_trend_keeps_budget():
+    x = np.arange(1000)
+    trend = reduce_trend(x, np.sin(x / 10.0), budget=50)
+    assert len(trend["x"]) == 50
+    assert len(trend["low"]) == len(trend["high"]) == 50
@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# One worker training the MGNREGA forests into a shared cache
+WORKER = """
+import sys
+from dashboard import artifacts, importance, loader
+mgnrega = loader.load_table("mgnrega")
+importance.yearly_models(mgnrega, artifacts.MGNREGA_FEATURES, artifacts.MGNREGA_TARGET, artifacts.MGNREGA_YEAR,
+                         n_estimators=10, n_jobs=1, cache_dir=sys.argv[1])
+"""
+
+
+def test_workers_training_together_share_one_fresh_cache(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    workers = [subprocess.Popen([sys.executable, "-c", WORKER, cache_dir], cwd=HERE, stderr=subprocess.PIPE, text=True)
+               for _ in range(4)]
+    errors = [error for error in (worker.communicate()[1] for worker in workers) if "Traceback" in error]
+    assert not errors, errors[0]
+
+    models = os.listdir(os.path.join(cache_dir, "models"))
+    importances = os.listdir(os.path.join(cache_dir, "importance"))
+    assert models and all(name.endswith(".joblib") for name in models)
+    assert len(importances) == len(models) and all(name.endswith(".json") for name in importances)
@@ -0,0 +1,61 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import ingest
+from dashboard import loader
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    data = tmp_path / "data"
+    data.mkdir()
+    for name in ingest.INPUTS:
+        shutil.copy(os.path.join(HERE, loader.SOURCES[name]), data / loader.SOURCES[name])
+    return data
+
+
+def _next_year(data_dir, name, tmp_path):
+    year = ingest.INPUTS[name][1]
+    rows = ingest.read_new_rows(data_dir / loader.SOURCES[name])
+    latest = rows[rows[year] == rows[year].max()]
+    path = tmp_path / f"{name}_new.csv"
+    latest.assign(**{year: latest[year] + 1}).to_csv(path, index=False)
+    return str(path)
+
+
+def _contents(data_dir):
+    return {name: (data_dir / loader.SOURCES[name]).read_bytes() for name in ingest.INPUTS}
+
+
+def test_ingest_appends_every_source(data_dir, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    paths = {name: _next_year(data_dir, name, tmp_path) for name in ("mgnrega", "area_affected")}
+    latest = {name: int(loader.load_table(name, str(data_dir), cache_dir)[ingest.INPUTS[name][1]].max()) for name in paths}
+
+    added = ingest.ingest(paths, str(data_dir), cache_dir)
+
+    assert added == {name: [year + 1] for name, year in latest.items()}
+    for name in paths:
+        assert loader.load_table(name, str(data_dir), cache_dir)[ingest.INPUTS[name][1]].max() == latest[name] + 1
+
+
+@pytest.mark.parametrize("bad", ["overlap", "missing column"])
+def test_bad_input_leaves_every_source_untouched(data_dir, tmp_path, bad):
+    cache_dir = str(tmp_path / "cache")
+    area = ingest.read_new_rows(data_dir / loader.SOURCES["area_affected"])
+    area = area.tail(3) if bad == "overlap" else area.tail(3).assign(Year=2100).drop(columns=area.columns[-1])
+    area.to_csv(tmp_path / "area_new.csv", index=False)
+    paths = {"mgnrega": _next_year(data_dir, "mgnrega", tmp_path), "area_affected": str(tmp_path / "area_new.csv")}
+    before = _contents(data_dir)
+    cached = loader.load_table("mgnrega", str(data_dir), cache_dir)
+
+    with pytest.raises(ValueError):
+        ingest.ingest(paths, str(data_dir), cache_dir)
+
+    assert _contents(data_dir) == before
+    pd.testing.assert_frame_equal(loader.load_table("mgnrega", str(data_dir), cache_dir), cached)
@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from dashboard import loader
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+YEARS = {"crop_data": "Crop_Year", "mgnrega": "year", "area_affected": "Year"}
+
+
+def _source(name):
+    source = pd.read_csv(os.path.join(HERE, loader.SOURCES[name]), encoding="utf-8-sig")
+    return source.rename(columns=lambda c: c.replace("\ufeff", "").strip())
+
+
+def _append_and_compare(tmp_path, name, base, new):
+    data_dir, cache_dir = str(tmp_path / "data"), str(tmp_path / "cache")
+    os.makedirs(data_dir)
+    base.to_csv(os.path.join(data_dir, loader.SOURCES[name]), index=False)
+
+    loader.load_table(name, data_dir, cache_dir)
+    loader.append_rows(name, new, data_dir, cache_dir)
+
+    fresh = loader.read_csv_compact(os.path.join(data_dir, loader.SOURCES[name]))
+    pd.testing.assert_frame_equal(loader.load_table(name, data_dir, cache_dir), fresh,
+                                  check_exact=True, check_categorical=False)
+
+
+@pytest.mark.parametrize("name", sorted(YEARS))
+def test_appended_year_loads_like_a_fresh_parse(tmp_path, name):
+    source = _source(name)
+    year = YEARS[name]
+    latest = source[source[year] == source[year].max()]
+    _append_and_compare(tmp_path, name, source, latest.assign(**{year: latest[year] + 1}))
+
+
+def test_rows_needing_a_wider_dtype_load_like_a_fresh_parse(tmp_path):
+    # Without its latest year Crop_data's yields fit float32; with it they don't
+    source = _source("crop_data")
+    latest = source["Crop_Year"] == source["Crop_Year"].max()
+    _append_and_compare(tmp_path, "crop_data", source[~latest], source[latest])
+
+
+# One cold-starting worker: load every source through the cache
+WORKER = "import sys; from dashboard import loader; [loader.load_table(n, sys.argv[1], sys.argv[2]) for n in loader.SOURCES]"
+
+
+def test_workers_starting_together_share_one_fresh_cache(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    workers = [subprocess.Popen([sys.executable, "-c", WORKER, HERE, cache_dir], cwd=HERE, stderr=subprocess.PIPE, text=True)
+               for _ in range(6)]
+    errors = [error for error in (worker.communicate()[1] for worker in workers) if "Traceback" in error]
+    assert not errors, errors[0]
+
+    for name in loader.SOURCES:
+        fresh = loader.read_csv_compact(os.path.join(HERE, loader.SOURCES[name]))
+        pd.testing.assert_frame_equal(loader.load_table(name, HERE, cache_dir), fresh, check_exact=True, check_categorical=False)
+    assert not [entry for entry in os.listdir(os.path.join(cache_dir, "columnar")) if entry.endswith(".tmp")]
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard.scaling import ScaledView
+
+
+@pytest.fixture
+def view():
+    frame = pd.DataFrame({"State": pd.Categorical(["A", "B", "A"]), "year": np.array([2021, 2021, 2022], dtype=np.int16),
+                          "x": [1.0, 3.0, 5.0]})
+    return ScaledView(frame, ["x"])
+
+
+def test_values_are_min_max_scaled(view):
+    assert view.frame["x"].tolist() == [0.0, 0.5, 1.0]
+    assert view.frame["year"].dtype == np.int16
+    assert isinstance(view.frame["State"].dtype, pd.CategoricalDtype)
+
+
+@pytest.mark.parametrize("write", [
+    lambda frame: frame.iloc.__setitem__((0, 2), 9.0),
+    lambda frame: frame.loc.__setitem__((frame.index[:2], "year"), 0),
+    lambda frame: frame.loc.__setitem__((0, "State"), "B"),
+])
+def test_in_place_writes_are_refused(view, write):
+    with pytest.raises(ValueError):
+        write(view.frame)
+    assert view.frame["x"].tolist() == [0.0, 0.5, 1.0]
+    assert view.frame["State"].tolist() == ["A", "B", "A"]
+
+
+def test_assigned_columns_stay_with_the_caller(view):
+    frame = view.frame
+    frame["x"] = 0.0
+    assert view.frame["x"].tolist() == [0.0, 0.5, 1.0]
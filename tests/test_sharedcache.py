@@ -0,0 +1,106 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from dashboard.sharedcache import SharedCache
+
+THREADS = 20
+
+
+def _wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.001)
+
+
+def _run_concurrently(cache, compute):
+    """Call get_or_compute("key") from THREADS threads while the first compute is held open."""
+    release = threading.Event()
+    outcomes = [None] * THREADS
+
+    def held():
+        release.wait()
+        return compute()
+
+    def call(i):
+        try:
+            outcomes[i] = ("value", cache.get_or_compute("key", held))
+        except Exception as error:
+            outcomes[i] = ("error", error)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    # Every other thread is blocked on the one computation before it is allowed to finish
+    _wait_for(lambda: cache.waits == THREADS - 1)
+    release.set()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+def test_concurrent_lookups_compute_once():
+    cache = SharedCache(max_bytes=1 << 20)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return np.arange(10)
+
+    outcomes = _run_concurrently(cache, compute)
+
+    assert len(calls) == 1
+    assert all(kind == "value" for kind, _ in outcomes)
+    assert all(value is outcomes[0][1] for _, value in outcomes)
+    assert cache.stats()["misses"] == 1
+    assert cache.get_or_compute("key", compute) is outcomes[0][1]
+    assert len(calls) == 1
+
+
+def test_error_reaches_every_waiter_and_is_not_cached():
+    cache = SharedCache(max_bytes=1 << 20)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        raise ValueError("boom")
+
+    outcomes = _run_concurrently(cache, compute)
+
+    assert len(calls) == 1
+    assert all(kind == "error" for kind, _ in outcomes)
+    assert all(error is outcomes[0][1] for _, error in outcomes)
+    assert "key" not in cache
+    # The next lookup tries again
+    with pytest.raises(ValueError):
+        cache.get_or_compute("key", compute)
+    assert len(calls) == 2
+
+
+def test_least_recently_used_entries_are_evicted_first():
+    item = np.zeros(100)  # 800 bytes
+    cache = SharedCache(max_bytes=3 * item.nbytes)
+    for key in "abc":
+        cache.put(key, item.copy())
+    cache.get_or_compute("a", lambda: None)  # a is now the most recently used
+
+    cache.put("d", item.copy())
+    assert "b" not in cache
+    assert all(key in cache for key in "acd")
+
+    cache.put("e", item.copy())
+    assert "c" not in cache
+    assert all(key in cache for key in "ade")
+    assert cache.evictions == 2
+    assert cache.size == 3 * item.nbytes
+
+
+def test_value_larger_than_the_cache_is_not_kept():
+    cache = SharedCache(max_bytes=100)
+    assert cache.get_or_compute("big", lambda: np.zeros(100)).shape == (100,)
+    assert "big" not in cache
+    assert cache.size == 0